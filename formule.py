@@ -0,0 +1,268 @@
+from functools import lru_cache
+
+from jedro import (
+    left_gadget_adj, left_gadget2_adj, middle_gadget_adj, right_gadget_adj,
+    right_gadget2_adj, add_gadget_adj, add_gadget2_adj, _check_n, _check_tree_n,
+    Ln_adj, build_caterpillar_adj, build_caterpillar2_adj, build_tree_adj, count_paths,
+)
+
+# ============================================================
+# Natančen izračun pn za družine Ln, Cat1, Cat2 in Tree brez naštevanja poti
+# ------------------------------------------------------------
+# Vse štiri družine so sestavljene iz majhnih kosov (gradnikov), ki so med
+# seboj povezani z mostovi. Pot, ki prečka most (t, x), razpade na del v
+# levem delu grafa, ki se konča v t, in del v desnem delu, ki se začne v x.
+#
+# Veriga (Ln, Cat1, Cat2):
+#   Po vsakem dodanem kosu hranimo stanje (P, O, 1), kjer je
+#       P ... število (usmerjenih) poti v dosedanjem grafu,
+#       O ... število poti, ki se končajo v izhodnem vozlišču t.
+#   Ko prek mostu (t, x) dodamo kos H z vhodom x in izhodom y, velja
+#       P' = P + P_H + 2 * O * f_H(x)
+#       O' = q_H(x, y) * O + f_H(y),
+#   kjer je P_H število poti v H, f_H(v) število poti v H z začetkom v v
+#   (vključno s trivialno) in q_H(x, y) število poti v H od x do y
+#   (q_H(x, x) = 1). To je linearna preslikava s 3x3 prenosno matriko, zato
+#   m enakih kosov dodamo z m-to potenco matrike (O(log m) množenj).
+#
+# Drevo (Tree):
+#   Notranja vozlišča drevesa so posamezna vozlišča, listi pa gradniki.
+#   Za vsako vozlišče v (od listov proti korenu) izračunamo
+#       down(v) ... poti z začetkom v v, ki gredo le v poddrevo v,
+#       tot(v)  ... vse poti v poddrevesu v;
+#   pri notranjem vozlišču z otroki c_i:
+#       down(v) = 1 + vsota down(c_i)
+#       tot(v)  = vsota tot(c_i) + 1 + 2 * vsota down(c_i)
+#                 + vsota_{i != j} down(c_i) * down(c_j).
+#
+# Konstante kosov (P_H, f_H, q_H) dobimo z naštevanjem poti na samem kosu,
+# zato formule sledijo neposredno iz gradnikov v jedro.py.
+# ============================================================
+
+
+def _paths_from(adj, v):
+    """Za vsako vozlišče w vrne število poti od v do w (trivialna pot šteje za w = v)."""
+
+    counts = [0] * len(adj)
+    stack = [(v, 1 << v)]
+    while stack:
+        u, mask = stack.pop()
+        counts[u] += 1
+        for w in adj[u]:
+            if not mask & (1 << w):
+                stack.append((w, mask | (1 << w)))
+    return counts
+
+
+def _piece(adj, x, y=None):
+    """
+    Konstante kosa adj z vhodom x in izhodom y:
+        (P_H, f_H(x), f_H(y), q_H(x, y)).
+    Brez izhoda (zadnji kos) sta f_H(y) in q_H(x, y) enaka 0.
+    """
+
+    from_x = _paths_from(adj, x)
+    if y is None:
+        return count_paths(adj), sum(from_x), 0, 0
+    return count_paths(adj), sum(from_x), sum(_paths_from(adj, y)), from_x[y]
+
+
+@lru_cache(maxsize=None)
+def _pieces():
+    """Konstante vseh kosov, ki jih uporabljajo družine (izračunamo enkrat)."""
+
+    left, t_left = left_gadget_adj()
+    right, t_right = right_gadget_adj()
+    middle, x, y = middle_gadget_adj()
+
+    # vozlišče hrbtenice gosenice z levim gradnikom (nogo); vhod in izhod sta 0
+    leg, t_leg = left_gadget_adj()
+    spine = add_gadget_adj([[]], 0, leg, t_leg)
+
+    # list drevesa z gradnikom; list je vozlišče 0
+    leaf_left = add_gadget2_adj([[]], 0, *left_gadget2_adj())
+    leaf_right = add_gadget2_adj([[]], 0, *right_gadget2_adj())
+
+    return {
+        # začetni kosi: stanje (P, O) je (P_H, f_H(t))
+        "left_start": _piece(left, t_left, t_left),
+        "right_start": _piece(right, t_right, t_right),
+        "middle": _piece(middle, x, y),
+        "spine": _piece(spine, 0, 0),
+        "left_end": _piece(left, t_left),
+        "right_end": _piece(right, t_right),
+        "leaf_left": _piece(leaf_left, 0, 0),
+        "leaf_right": _piece(leaf_right, 0, 0),
+    }
+
+
+def _transfer(piece):
+    """Prenosna matrika kosa za stanje (P, O, 1)."""
+
+    P_H, f_x, f_y, q = piece
+    return ((1, 2 * f_x, P_H),
+            (0, q, f_y),
+            (0, 0, 1))
+
+
+def _mat_mul(A, B):
+    return tuple(
+        tuple(sum(A[i][k] * B[k][j] for k in range(3)) for j in range(3))
+        for i in range(3)
+    )
+
+
+def _mat_pow(A, m):
+    """A^m s kvadriranjem."""
+
+    R = ((1, 0, 0), (0, 1, 0), (0, 0, 1))
+    while m:
+        if m & 1:
+            R = _mat_mul(R, A)
+        A = _mat_mul(A, A)
+        m >>= 1
+    return R
+
+
+def _chain(start, middle, end):
+    """
+    pn verige: začetni kos, nato kosi iz middle (seznam parov (kos, m),
+    vsak kos ponovljen m-krat), na koncu zadnji kos.
+    """
+
+    pieces = _pieces()
+    P, O, _, _ = pieces[start]
+    state = (P, O, 1)
+
+    for name, m in middle:
+        M = _mat_pow(_transfer(pieces[name]), m)
+        state = tuple(sum(M[i][k] * state[k] for k in range(3)) for i in range(3))
+
+    P, O, _ = state
+    P_H, f_x, _, _ = pieces[end]
+    return P + P_H + 2 * O * f_x
+
+
+def pn_Ln(n):
+    """pn(Ln_graph(n)) brez naštevanja poti."""
+
+    _check_n(n)
+
+    desni_konec = (n % 4 == 0)
+    m = (n - 12) // 4 if desni_konec else (n - 10) // 4
+    return _chain("left_start", [("middle", m)], "right_end" if desni_konec else "left_end")
+
+
+def pn_caterpillar(n):
+    """pn(build_caterpillar(n)) brez naštevanja poti."""
+
+    _check_n(n)
+
+    mod = n % 6
+    m = (n - 10) // 6
+    start = "left_start" if mod in (0, 4) else "right_start"
+    end = "left_end" if mod == 4 else "right_end"
+    return _chain(start, [("spine", m)], end)
+
+
+def pn_caterpillar2(n):
+    """pn(build_caterpillar2(n)) brez naštevanja poti."""
+
+    _check_n(n)
+
+    mod = n % 6
+    m = (n - 10) // 6
+    end = "left_end" if mod in (2, 4) else "right_end"
+
+    # pri mod == 2 po nogah pride še en srednji gradnik
+    middle = [("spine", m), ("middle", 1 if mod == 2 else 0)]
+    return _chain("left_start", middle, end)
+
+
+def pn_tree(n):
+    """pn(build_tree(n)) brez naštevanja poti."""
+
+    _check_tree_n(n)
+
+    mod = n % 6
+    levi_prvi = mod in (0, 4)
+    levi_drugi = mod == 4
+
+    k = 4 + 2 * ((n - 16) // 6)
+    pieces = _pieces()
+
+    # tree(k) razveja liste po vrsti nastanka, zato ima vozlišče v >= 1
+    # otroka 2v + 2 in 2v + 3 (koren pa 1, 2, 3); listi so vozlišča z
+    # 2v + 2 >= k, v vrstnem redu indeksov (glej tree_adj)
+    first_leaf = max(1, k // 2 - 1)
+    P_left, f_left, _, _ = pieces["leaf_left"]
+
+    down = [f_left] * k
+    tot = [P_left] * k
+    for i, levi in ((0, levi_prvi), (1, levi_drugi)):
+        P_H, f_t, _, _ = pieces["leaf_left" if levi else "leaf_right"]
+        down[first_leaf + i] = f_t
+        tot[first_leaf + i] = P_H
+
+    for v in range(first_leaf - 1, 0, -1):
+        a, b = 2 * v + 2, 2 * v + 3
+        da, db = down[a], down[b]
+        down[v] = 1 + da + db
+        tot[v] = tot[a] + tot[b] + 1 + 2 * (da + db) + 2 * da * db
+
+    # koren s tremi otroki: vsota_{i != j} d_i d_j = s^2 - vsota d_i^2
+    s = down[1] + down[2] + down[3]
+    s2 = down[1] ** 2 + down[2] ** 2 + down[3] ** 2
+    return tot[1] + tot[2] + tot[3] + 1 + 2 * s + s * s - s2
+
+
+# Družine: ime -> (formula, seznam sosedov za primerjavo z naštevanjem)
+FAMILIES = {
+    "Ln": (pn_Ln, Ln_adj),
+    "Cat1": (pn_caterpillar, build_caterpillar_adj),
+    "Cat2": (pn_caterpillar2, build_caterpillar2_adj),
+    "Tree": (pn_tree, build_tree_adj),
+}
+
+
+def verify_formulas(n_max=36, blocks_n_max=300, verbose=False):
+    """
+    Primerja formule z naštevanjem (count_paths, "dfs") za n <= n_max in
+    z razcepom na bloke ("blocks") za n <= blocks_n_max. Vrne seznam
+    neujemanj (družina, n, formula, naštevanje); prazen seznam pomeni,
+    da se vse ujema.
+
+    Preveri tudi, da formula in gradnja za neveljavne n (lihe, n < 10 oz.
+    pri Tree n < 16) sprožita ValueError; če katera ne, je to neujemanje
+    z "ValueError" oz. "brez napake" namesto števila poti.
+    """
+
+    mismatches = []
+    for name, (formula, build) in FAMILIES.items():
+        first = 16 if name == "Tree" else 10
+        for n in [first - 1] + list(range(4, first, 2)):
+            raised = [_raises_value_error(f, n) for f in (formula, build)]
+            if not all(raised):
+                mismatches.append((name, n, *("ValueError" if r else "brez napake"
+                                              for r in raised)))
+
+        for n in range(first, max(n_max, blocks_n_max) + 1, 2):
+            method = "dfs" if n <= n_max else "blocks"
+            expected = count_paths(build(n), method)
+            got = formula(n)
+            if got != expected:
+                mismatches.append((name, n, got, expected))
+            if verbose:
+                print(f"{name:5s} n={n:4d} {method:6s} {'ok' if got == expected else 'NAPAKA'}")
+
+    return mismatches
+
+
+def _raises_value_error(f, n):
+    """Ali f(n) sproži ValueError (druge izjeme se razširijo naprej)."""
+
+    try:
+        f(n)
+    except ValueError:
+        return True
+    return False
@@ -1,74 +1,44 @@
+from jedro import (
+    left_gadget_adj, left_gadget2_adj, middle_gadget_adj, right_gadget_adj,
+    right_gadget2_adj, Ln_adj, build_caterpillar_adj, build_caterpillar2_adj,
+    tree_adj, build_tree_adj, to_sage_graph, count_paths, path_statistics,
+    estimate_paths, check_method,
+    _adjacency, _apply_swap, _swap_delta, _count_paths_orbits,
+    _girth_lower_bound, _count_short_paths,
+)
+
+# Konstrukcije gradimo v jedro.py s seznami sosedov, Sage Graph naredimo
+# šele na koncu, da uvoz tega modula ne naloži Sage.
+
 def left_gadget():
     """Konstruira levi gradnik"""
 
-    G = graphs.CompleteGraph(4)  # K4
-    G.delete_edge(0, 1)          # K4 - e; 0 in 1 sta zdaj stopnje 2
-
-    t = 4
-    G.add_vertex(t) # Dodamo zgornje vozlišče
-    G.add_edge(t, 0)
-    G.add_edge(t, 1) # Povežemo zgornje vozlišče
-
-    return G, t # Vrnemo graf in vozlišče na katerega bomo vezali naprej
+    G, t = left_gadget_adj()
+    return to_sage_graph(G), t # Vrnemo graf in vozlišče na katerega bomo vezali naprej
 
 def left_gadget2():
     """Konstruira levi gradnik"""
 
-    G = graphs.CompleteGraph(4)  # K4
-    G.delete_edge(0, 1)          # K4 - e; 0 in 1 sta zdaj stopnje 2
-
-    return G, 0, 1 # Vrnemo graf in vozlišče na katerega bomo vezali naprej
+    G, t1, t2 = left_gadget2_adj()
+    return to_sage_graph(G), t1, t2 # Vrnemo graf in vozlišče na katerega bomo vezali naprej
 
 def middle_gadget():
     """konstruira srednji gradnik"""
 
-    G = graphs.CompleteGraph(4) # K4
-    G.delete_edge(0, 1)  # zdaj sta 0 in 1 stopnje 2
-
-    L, R = 0, 1 # Vozlišči na kateri bomo naprej vezali
-
-    return G, L, R
+    G, L, R = middle_gadget_adj() # Vozlišči na kateri bomo naprej vezali
+    return to_sage_graph(G), L, R
 
 def right_gadget():
     """Konstruira desni gradnik"""
 
-    G = graphs.CompleteGraph(4)  # K4
-    G.delete_edge(0, 1)          # K4 - e; 0 in 1 sta zdaj stopnje 2
-
-    # Dodamo povezani vozlišči
-    x = 4
-    y = 5
-    G.add_vertices([x, y])
-    G.add_edge(x, y)
-
-    # Povežemo vozlišča
-    G.add_edge(0, x)
-    G.add_edge(1, y)
-
-    t = 6
-    G.add_vertex(t) # Dodamo zgornje vozlišče
-    G.add_edge(t, x)
-    G.add_edge(t, y) # Povežemo zgornje vozlišče
-
-    return G, t # Vrnemo graf in vozlišče na katerega bomo vezali naprej
+    G, t = right_gadget_adj()
+    return to_sage_graph(G), t # Vrnemo graf in vozlišče na katerega bomo vezali naprej
 
 def right_gadget2():
     """Konstruira desni gradnik"""
 
-    G = graphs.CompleteGraph(4)  # K4
-    G.delete_edge(0, 1)          # K4 - e; 0 in 1 sta zdaj stopnje 2
-
-    # Dodamo povezani vozlišči
-    x = 4
-    y = 5
-    G.add_vertices([x, y])
-    G.add_edge(x, y)
-
-    # Povežemo vozlišča
-    G.add_edge(0, x)
-    G.add_edge(1, y)
-
-    return G, x, y # Vrnemo graf in vozlišče na katerega bomo vezali naprej
+    G, x, y = right_gadget2_adj()
+    return to_sage_graph(G), x, y # Vrnemo graf in vozlišče na katerega bomo vezali naprej
 
 
 def add_gadget(G, t1, H, t2, t3 = ""):
@@ -116,124 +86,25 @@ def add_gadget2(G, t1, H, t2, t3):
 def Ln_graph(n):
     """Naredi Ln graf z n vozlišči."""
 
-    # Varovalka za sode n > 10
-    if n % 2 != 0 or n < 10:
-        raise ValueError("Za L_n mora biti n sodo in n >= 10.")
-
-    desni_konec = (n % 4 == 0) # Ali končamo z desnim grednikom
-    m = (n - 12) // 4 if desni_konec else (n - 10) // 4 # Število srednjih gradnikov
-
-    # Začnemo z levim gradnikom
-    G, t = left_gadget()
-
-    # Dodamo m srednjih gradnikov
-    if m > 0:
-        M, x, y = middle_gadget()
-        for _ in range(m):
-            G, t = add_gadget(G, t, M, x, y)
-
-    # Zaključimo z levim oz. desnim gradnikom
-    if desni_konec:
-        D, x = right_gadget()
-        G = add_gadget(G, t, D, x)
-    else:
-        L, x = left_gadget()
-        G = add_gadget(G, t, L, x)
-    
-    return G
+    return to_sage_graph(Ln_adj(n))
 
 def build_caterpillar(n):
     """Naredi boljši graf kot Ln"""
 
-    # Varovalka za sode n > 10
-    if n % 2 != 0 or n < 10:
-        raise ValueError("Za L_n mora biti n sodo in n >= 10.")
-
-    # določanje začetnih in končnih gradnikov
-    mod = n % 6
-    m = (n - 10) // 6 # Število vmesnih gradnikov
-    if mod == 0:
-        levi_zacetek, levi_konec = True, False
-    elif mod == 2:
-        levi_zacetek, levi_konec = False, False
-    elif mod == 4:
-        levi_zacetek, levi_konec = True, True
-
-    # Začnemo s prvim gradnikom
-    if levi_zacetek:
-        G, t = left_gadget()
-    else: 
-        G, t = right_gadget()
-
-    # Dodamo m vmesnih (levih) gradnikov
-    if m > 0:
-        H, y = left_gadget()
-        for _ in range(m):
-            x = G.num_verts()
-            G.add_vertex(x) # Dodamo vozlišče za povezavo
-            G.add_edge(t, x) # povežemo ga z osnovo
-            G = add_gadget(G, x, H, y)
-            t = x
-
-    # Zadnji gradnik
-    if levi_konec:
-        H, y = left_gadget()
-        G = add_gadget(G, t, H, y)
-    else: 
-        H, y = right_gadget()
-        G = add_gadget(G, t, H, y)
-
-    return G
+    return to_sage_graph(build_caterpillar_adj(n))
 
 def build_caterpillar2(n):
     """Naredi boljši graf kot Ln"""
 
-    # Varovalka za sode n > 10
-    if n % 2 != 0 or n < 10:
-        raise ValueError("Za L_n mora biti n sodo in n >= 10.")
-
-    # določanje začetnih in končnih gradnikov
-    mod = n % 6
-    m = (n - 10) // 6 # Število vmesnih gradnikov
-    if mod == 0:
-        srednji, levi_konec = False, False
-    elif mod == 2:
-        srednji, levi_konec = True, True
-    elif mod == 4:
-        srednji, levi_konec = False, True
-
-    # Začnemo z levim gradnikom
-    G, t = left_gadget()
-
-    # Dodamo m vmesnih (levih) gradnikov
-    if m > 0:
-        H, y = left_gadget()
-        for _ in range(m):
-            x = G.num_verts()
-            G.add_vertex(x) # Dodamo vozlišče za povezavo
-            G.add_edge(t, x) # povežemo ga z osnovo
-            G = add_gadget(G, x, H, y)
-            t = x
-
-    # Po potrebi dodamo srednji gradnik
-    if srednji:
-        H, x, y = middle_gadget()
-        G, t = add_gadget(G, t, H, x, y)
-
-    # Zadnji gradnik
-    if levi_konec:
-        H, y = left_gadget()
-        G = add_gadget(G, t, H, y)
-    else: 
-        H, y = right_gadget()
-        G = add_gadget(G, t, H, y)
+    return to_sage_graph(build_caterpillar2_adj(n))
 
-    return G
-
-from sage.all import graphs
+def cubic_graphs(n, res=None, mod=None):
+    """
+    Vrne generator vseh (neizomorfnih) 3-regularnih povezanih grafov na n vozliščih.
 
-def cubic_graphs(n):
-    """Vrne generator vseh (neizomorfnih) 3-regularnih povezanih grafov na n vozliščih."""
+    Če podamo res in mod, geng vrne le res-ti od mod približno enako velikih
+    delov (0 <= res < mod); unija vseh delov so ravno vsi grafi.
+    """
 
     # varovalka za sodi n >= 4
     if n % 2 or n < 4:
@@ -242,16 +113,24 @@ def cubic_graphs(n):
     # povemo, da želimo grafe z n vozlišči in stopnjo vozlišč točno 3 (najmanjša in največja stopnja je 3)
     flags = f"-d3 -D3 -c {n}"
 
+    # po potrebi izberemo le en del
+    if mod is not None or res is not None:
+        # res in mod podamo le skupaj
+        if res is None or mod is None or not 0 <= res < mod:
+            raise ValueError("Veljati mora 0 <= res < mod.")
+        flags += f" {res}/{mod}"
+
     # vrnemo generator vseh takih grafov
+    from sage.all import graphs
     return graphs.nauty_geng(flags) 
 
 
 
 
 
-def subpath_number(G):
+def subpath_number(G, method="dfs", limit=None, cache=None):
     # ============================================================
-    # Funkcija subpath_number(G)
+    # Funkcija subpath_number(G, method="dfs", limit=None, cache=None)
     # ------------------------------------------------------------
     # Namen:
     #   Izračuna število vseh poti v danem grafu G (vključno s
@@ -262,59 +141,164 @@ def subpath_number(G):
     #   kjer sta vsaki zaporedni vozlišči povezni z robom grafa.
     #   Graf je neorientiran, zato se obrnjene poti štejejo ločeno.
     #
-    # Postopek:
-    #   1. Graf pretvorimo v numerično obliko (vozlišča 0..n-1).
-    #   2. Zgradimo seznam sosedov (adjacency list).
-    #   3. Iz vsakega vozlišča sprožimo rekurzivni DFS, ki šteje vse
-    #      možne poti brez ponavljanja vozlišč.
-    #   4. Uporabimo bitmasko (int) za označevanje že obiskanih vozlišč,
-    #      da je algoritem hiter in porabi malo pomnilnika.
-    #   5. Števec `total` poveča vsakič, ko najde veljavno pot
-    #      (tudi trivialno z enim samim vozliščem).
+    # Načini (method):
+    #   "dfs"    - iterativni DFS, ki vsako neusmerjeno pot našteje enkrat
+    #              (glej jedro._count_paths_fast); če je na voljo, uporabi
+    #              prevedeno jedro iz stetje_poti.pyx
+    #   "blocks" - razcep na bloke (2-povezane komponente in mostove),
+    #              glej jedro._count_paths_blocks
+    #   "frontier" - dinamično programiranje po fronti vzdolž vrstnega
+    #              reda vozlišč z majhno fronto (razčlenitev na poti),
+    #              glej jedro._count_paths_frontier
+    #   "auto"   - izbere enega od zgornjih načinov glede na velikost
+    #              grafa, širino fronte in velikost blokov
+    #              (glej jedro.choose_method)
+    #   "orbits" - orbite avtomorfizmov (Sage/nauty), DFS iz enega
+    #              predstavnika na orbito, utežen z velikostjo orbite;
+    #              rezultat je natančen (glej jedro._count_paths_orbits)
+    #
+    # Omejeno štetje (limit):
+    #   Če podamo limit, se štetje ustavi, ko število poti doseže limit.
+    #   Rezultat je natančen, če je manjši od limit, sicer pa funkcija
+    #   vrne kar limit (pomeni "vsaj limit"). Primerjava
+    #   subpath_number(G, limit=x) < x je torej enaka primerjavi
+    #   subpath_number(G) < x, le hitrejša. Predčasno ustavitev podpira
+    #   način "dfs", pri ostalih načinih se rezultat le omeji.
+    #
+    # Predpomnilnik (cache):
+    #   Če podamo cache (npr. predpomnilnik.PathCountCache), najprej
+    #   pogledamo vanj (ključ je kanonični graph6, zato zadetke dobimo
+    #   tudi za izomorfne grafe), natančne rezultate pa vanj shranimo.
     #
     # Časovna zahtevnost:
-    #   Eksponentna v številu vozlišč, ker štejemo vse poti.
-    #   Uporabno za grafe velikosti do približno n ≤ 22.
+    #   "dfs" je eksponenten v številu vozlišč, ker štejemo vse poti.
+    #   Uporabno za grafe velikosti do približno n ≤ 22; za večje splošne
+    #   grafe je na voljo ocena s standardno napako
+    #   (subpath_number_estimate).
+    #   "blocks" je eksponenten le v velikosti največjega bloka, zato
+    #   je za verige gradnikov (Ln, Cat1, Cat2, Tree) polinomski v n.
+    #   "frontier" je eksponenten le v širini fronte (npr. 4 za Ln, 5 za
+    #   gosenice), zato šteje tudi grafe z nekaj sto ali tisoč vozlišči.
+    #   "orbits" zmanjša delo za faktor n / (število orbit), vendar DFS
+    #   iz vozlišča našteje vsako pot z obeh krajišč, zato se splača šele,
+    #   ko je orbit manj kot približno n / 2 (npr. build_tree).
     #
     # Rezultat:
     #   Vrne celo število (int) — število vseh poti v G.
     # ============================================================
 
-    # Pretvori vozlišča v indekse 0..n-1 za učinkovitejši dostop
-    verts = list(G.vertices())
-    idx = {v: i for i, v in enumerate(verts)}
+    # način preverimo pred predpomnilnikom, da napačen klic ne uspe le
+    # zaradi zadetka
+    check_method(method)
+    if method == "orbits" and not hasattr(G, "automorphism_group"):
+        raise ValueError('Način "orbits" potrebuje Sage graf.')
+
+    if cache is not None:
+        key = cache.key(G)
+        total = cache.get(key)
+        if total is not None:
+            return limit if limit is not None and total >= limit else total
+
+    verts, adj = _adjacency(G)
+    if method == "orbits":
+        # orbite izračunamo kar na G, brez pretvorbe nazaj v Sage graf
+        idx = {v: i for i, v in enumerate(verts)}
+        orbits = [[idx[v] for v in orbit]
+                  for orbit in G.automorphism_group(orbits=True, return_group=False)]
+        total = _count_paths_orbits(adj, orbits, limit)
+    else:
+        total = count_paths(adj, method, limit)
+
+    if limit is not None and total >= limit:
+        return limit
 
-    # Zgradi seznam sosedov (adjacency list)
-    adj = [[] for _ in verts]
-    for v in verts:
-        i = idx[v]
-        for w in G.neighbors(v):
-            adj[i].append(idx[w])
-
-    n = len(verts)
-    total = 0  # števec vseh poti
-
-    # Rekurzivna funkcija za globinsko iskanje (DFS)
-    def dfs(u, mask):
-        # Povečamo števec ob vsakem obisku — vsaka kombinacija
-        # obiskanih vozlišč predstavlja eno pot
-        nonlocal total
-        total += 1
-
-        # Premaknemo se na vsakega soseda, ki še ni bil obiskan
-        for w in adj[u]:
-            bit = 1 << w
-            if not (mask & bit):  # če w še ni bil obiskan
-                dfs(w, mask | bit)
-
-    # Za vsako vozlišče zaženemo DFS kot začetno točko
-    for i in range(n):
-        dfs(i, 1 << i)
-
-    # Vrni skupno število poti
+    # v predpomnilnik shranimo le natančne rezultate
+    if cache is not None:
+        cache.put(key, total)
     return total
 
 
+def subpath_number_delta(G, removed, added, limit=None):
+    """
+    Vrne razliko subpath_number(G_new) - subpath_number(G), kjer G_new
+    dobimo iz G tako, da odstranimo robove `removed` in dodamo robove `added`
+    (npr. double-edge swap iz random_cubic_neighbor).
+
+    Poti, ki ne uporabljajo nobenega od spremenjenih robov, so v obeh grafih
+    enake, zato preštejemo le poti skozi odstranjene robove v G in poti skozi
+    dodane robove v G_new.
+
+    Če podamo limit, ima ta enak pomen kot pri subpath_number: razlika je
+    natančna, če je manjša od limit, sicer funkcija vrne limit.
+    """
+
+    if not removed and not added:
+        return 0 if limit is None or 0 < limit else limit
+
+    verts, adj = _adjacency(G)
+    idx = {v: i for i, v in enumerate(verts)}
+    removed = [(idx[u], idx[v]) for u, v in removed]
+    added = [(idx[u], idx[v]) for u, v in added]
+
+    # adj naj predstavlja graf po zamenjavi
+    _apply_swap(adj, removed, added)
+    return _swap_delta(adj, removed, added, limit)
+
+
+def subpath_statistics(G, lengths=True, starts=True, edges=True):
+    """
+    Statistike poti grafa G v enem prehodu (glej jedro.path_statistics):
+    pn, porazdelitev dolžin, število poti z začetkom v vsakem vozlišču in
+    število poti skozi vsak rob, kot NumPy tabele.
+
+    Dodatno vrne "vertices" (vozlišče, ki ustreza indeksu v "starts"),
+    robovi v "edge_list" pa so podani z oznakami vozlišč grafa G.
+    """
+
+    verts, adj = _adjacency(G)
+    out = path_statistics(adj, lengths, starts, edges)
+    out["vertices"] = verts
+    out["edge_list"] = [(verts[u], verts[v]) for u, v in out["edge_list"]]
+    return out
+
+
+def subpath_lower_bound(G, k=0):
+    """
+    Vrne poceni spodnjo mejo za subpath_number(G).
+
+    Meja iz ožine (girth) g in najmanjše stopnje d: vsak sprehod brez
+    vračanja dolžine < g je pot, iz vsakega vozlišča pa je takih sprehodov
+    dolžine j vsaj d * (d - 1)^(j - 1). Pri regularnih grafih z ožino 3
+    prištejemo še natančno število poti dolžine 3, ki ga zmanjšajo le
+    trikotniki.
+
+    Če je k > 0, vrne večjo od te meje in natančnega števila poti
+    dolžine največ k (glej _count_short_paths).
+    """
+
+    verts, adj = _adjacency(G)
+    bound = _girth_lower_bound(adj)
+    if k > 0:
+        bound = max(bound, _count_short_paths(adj, k))
+    return bound
+
+
+def subpath_number_estimate(G, samples=None, rel_error=None, seconds=None, seed=None):
+    """
+    Nepristranska ocena subpath_number(G) z naključnimi preizkusi drevesa
+    DFS, za grafe, kjer je natančno štetje prepočasno (npr. n = 50..200).
+
+    Vzorčimo do samples vzorcev, do relativne standardne napake rel_error
+    ali do časovnega proračuna seconds (karkoli je prej; brez argumentov
+    100 vzorcev). Vrne (ocena, stderr, število vzorcev); približni 95 %
+    interval zaupanja je ocena ± 2 * stderr. Glej jedro.estimate_paths.
+
+    Primer:
+        est, se, k = subpath_number_estimate(build_tree(200), rel_error=0.005)
+    """
+
+    verts, adj = _adjacency(G)
+    return estimate_paths(adj, samples, rel_error, seconds, seed)
 
 
 #--------------------------------------------------------------------------------
@@ -333,8 +317,6 @@ def encode_time_hms(elapsed):
     return f"{h:02d}:{m:02d}:{s:02d}.{ms:03d}"
 
 
-from sage.all import Graph
-
 def tree(k):
     """
     Zgradi drevo na k vozliščih (k sodo, k >= 4).
@@ -344,79 +326,13 @@ def tree(k):
         leaves ... seznam končnih vozlišč (listov), v vrstnem redu nastanka
     """
 
-    if k % 2 != 0 or k < 4:
-        raise ValueError("k mora biti sodo in k >= 4.")
-
-    G = Graph()
-
-    # Dodamo koren
-    root = 0
-    G.add_vertex(root)
-
-    # Prva razvejitev: koren -> trije otroci
-    leaves = []
-    for i in range(1, 4):
-        G.add_vertex(i)
-        G.add_edge(root, i)
-        leaves.append(i)
-
-    current_n = 4
+    G, leaves = tree_adj(k)
+    return to_sage_graph(G), leaves
 
-    # Nadaljnje razvejitve
-    while current_n < k:
-        v = leaves.pop(0)  # vzamemo najstarejši list
-
-        a = current_n
-        b = current_n + 1
-        G.add_vertices([a, b])
-        G.add_edge(v, a)
-        G.add_edge(v, b)
-
-        # v ni več list; nova lista:
-        leaves.append(a)
-        leaves.append(b)
-
-        current_n += 2
-
-    return G, leaves
 def build_tree(n):
     """Naredi boljši graf kot Ln"""
 
-    # Varovalka za sode n > 10
-    if n % 2 != 0 or n < 10:
-        raise ValueError("Za L_n mora biti n sodo in n >= 10.")
-
-    # določanje začetnih in končnih gradnikov
-    mod = n % 6
-    if mod == 0:
-        levi_prvi, levi_drugi = True, False
-    elif mod == 2:
-        levi_prvi, levi_drugi = False, False
-    elif mod == 4:
-        levi_prvi, levi_drugi = True, True
-
-    k = 4 + 2 * ((n - 16) // 6)
-
-    # Začnemo z drevesom
-    G, leaves = tree(k)
-    H1, t11, t12 = left_gadget2()
-    H2, t21, t22 = right_gadget2()
-
-    for i, t in enumerate(leaves):
-        if i == 0:
-            if levi_prvi:
-                G = add_gadget2(G, t, H1, t11, t12)
-            else:
-                G = add_gadget2(G, t, H2, t21, t22)
-        elif i == 1:
-            if levi_drugi:
-                G = add_gadget2(G, t, H1, t11, t12)
-            else:
-                G = add_gadget2(G, t, H2, t21, t22)
-        else:
-            G = add_gadget2(G, t, H1, t11, t12)
-
-    return G
+    return to_sage_graph(build_tree_adj(n))
 
 from collections import deque
 
@@ -471,21 +387,22 @@ def spanning_tree(G, root=0):
     Deluje v vseh SageMath verzijah.
     """
 
-    T = Graph()
-    T.add_vertices(G.vertices())
+    from sage.all import Graph
 
     visited = set([root])
-    queue = [root]
+    queue = deque([root])
+    edges = []
 
     while queue:
-        v = queue.pop(0)
+        v = queue.popleft()
         for u in G.neighbors(v):
             if u not in visited:
                 visited.add(u)
                 queue.append(u)
-                T.add_edge(v, u)
+                edges.append((v, u))
 
-    return T
+    # drevo zgradimo naenkrat, ne rob za robom
+    return Graph([G.vertices(), edges], format="vertices_and_edges")
 
 
 def show_build_tree_tree_layout(n, root=0, **show_kwds):
@@ -526,7 +443,8 @@ def tree_layout_for_graph(G, root=0):
     - na T naredi lep drevesni layout
     - vrne slovar pos za uporabo v G.plot(pos=pos, ...).
     """
-    T = spanning_tree(G, root=root)
-    pos = tree_layout_positions_from_tree(T, root=root)
-    return pos
+    # enaka postavitev kot tree_layout_positions_from_tree(spanning_tree(G)),
+    # le da jo izračunamo neposredno iz seznama sosedov v času O(n + m)
+    from risanje import graph_layout
+    return graph_layout(G, "tree", root=root)
 
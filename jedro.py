@@ -0,0 +1,1892 @@
+"""
+Jedro brez Sage: gradniki in konstrukcije grafov, graph6, štetje poti in
+kubična double-edge swap poteza.
+
+Grafi so podani s seznamom sosedov adj (vozlišča 0..n-1), zato modul
+uvozimo hitro, tudi v delovnih procesih. Sage uvozimo šele, ko ga
+potrebujemo (to_sage_graph, vertex_orbits, CubicGraph.from_graph/to_graph).
+"""
+
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+from collections import deque
+from functools import lru_cache
+
+
+#--------------------------------------------------------------------------------
+# Gradniki in konstrukcije (kot v funkcije2, le da vračajo seznam sosedov)
+#--------------------------------------------------------------------------------
+
+def _k4_minus_edge():
+    """K4 brez roba (0, 1); vozlišči 0 in 1 sta stopnje 2."""
+
+    return [[2, 3], [2, 3], [0, 1, 3], [0, 1, 2]]
+
+
+def left_gadget_adj():
+    """Levi gradnik (glej funkcije2.left_gadget)."""
+
+    adj = _k4_minus_edge()
+    t = 4
+    adj.append([0, 1])  # zgornje vozlišče
+    adj[0].append(t)
+    adj[1].append(t)
+
+    return adj, t
+
+
+def left_gadget2_adj():
+    """Levi gradnik brez zgornjega vozlišča (glej funkcije2.left_gadget2)."""
+
+    return _k4_minus_edge(), 0, 1
+
+
+def middle_gadget_adj():
+    """Srednji gradnik (glej funkcije2.middle_gadget)."""
+
+    return _k4_minus_edge(), 0, 1
+
+
+def right_gadget2_adj():
+    """Desni gradnik brez zgornjega vozlišča (glej funkcije2.right_gadget2)."""
+
+    adj = _k4_minus_edge()
+    x, y = 4, 5
+    adj.append([0, y])
+    adj.append([x, 1])
+    adj[0].append(x)
+    adj[1].append(y)
+
+    return adj, x, y
+
+
+def right_gadget_adj():
+    """Desni gradnik (glej funkcije2.right_gadget)."""
+
+    adj, x, y = right_gadget2_adj()
+    t = 6
+    adj.append([x, y])  # zgornje vozlišče
+    adj[x].append(t)
+    adj[y].append(t)
+
+    return adj, t
+
+
+def add_gadget_adj(adj, t1, H, t2, t3=""):
+    """
+    Grafu adj doda graf H z zamaknjenim številčenjem in ga poveže z robom
+    (t1, t2). Kot funkcije2.add_gadget: če podamo t3, vrne (adj, t3 v novem
+    številčenju), sicer adj. Graf adj spremeni na mestu.
+    """
+
+    k = len(adj)
+    adj.extend([w + k for w in a] for a in H)
+    adj[t1].append(t2 + k)
+    adj[t2 + k].append(t1)
+
+    if t3 != "":
+        return adj, t3 + k
+    return adj
+
+
+def add_gadget2_adj(adj, t1, H, t2, t3):
+    """Kot funkcije2.add_gadget2: doda H in ga z vozliščem t1 poveže v t2 in t3."""
+
+    k = len(adj)
+    adj.extend([w + k for w in a] for a in H)
+    for t in (t2, t3):
+        adj[t1].append(t + k)
+        adj[t + k].append(t1)
+
+    return adj
+
+
+def _add_vertex(adj, t):
+    """Doda novo vozlišče, povezano s t, in vrne njegov indeks."""
+
+    x = len(adj)
+    adj.append([t])
+    adj[t].append(x)
+    return x
+
+
+def _check_n(n):
+    # Varovalka za sode n > 10
+    if n % 2 != 0 or n < 10:
+        raise ValueError("Za L_n mora biti n sodo in n >= 10.")
+
+
+def _check_tree_n(n):
+    # Tree potrebuje drevo z vsaj štirimi vozlišči (k >= 4), torej n >= 16
+    _check_n(n)
+    if n < 16:
+        raise ValueError("Za Tree mora biti n sodo in n >= 16.")
+
+
+def Ln_adj(n):
+    """Seznam sosedov grafa Ln z n vozlišči (glej funkcije2.Ln_graph)."""
+
+    _check_n(n)
+
+    desni_konec = (n % 4 == 0) # Ali končamo z desnim grednikom
+    m = (n - 12) // 4 if desni_konec else (n - 10) // 4 # Število srednjih gradnikov
+
+    adj, t = left_gadget_adj()
+
+    M, x, y = middle_gadget_adj()
+    for _ in range(m):
+        adj, t = add_gadget_adj(adj, t, M, x, y)
+
+    if desni_konec:
+        D, x = right_gadget_adj()
+    else:
+        D, x = left_gadget_adj()
+    return add_gadget_adj(adj, t, D, x)
+
+
+def build_caterpillar_adj(n):
+    """Seznam sosedov grafa Cat1 (glej funkcije2.build_caterpillar)."""
+
+    _check_n(n)
+
+    mod = n % 6
+    m = (n - 10) // 6 # Število vmesnih gradnikov
+    levi_zacetek = mod in (0, 4)
+    levi_konec = mod == 4
+
+    adj, t = left_gadget_adj() if levi_zacetek else right_gadget_adj()
+
+    H, y = left_gadget_adj()
+    for _ in range(m):
+        x = _add_vertex(adj, t) # vozlišče za povezavo z osnovo
+        adj = add_gadget_adj(adj, x, H, y)
+        t = x
+
+    H, y = left_gadget_adj() if levi_konec else right_gadget_adj()
+    return add_gadget_adj(adj, t, H, y)
+
+
+def build_caterpillar2_adj(n):
+    """Seznam sosedov grafa Cat2 (glej funkcije2.build_caterpillar2)."""
+
+    _check_n(n)
+
+    mod = n % 6
+    m = (n - 10) // 6 # Število vmesnih gradnikov
+    srednji = mod == 2
+    levi_konec = mod in (2, 4)
+
+    adj, t = left_gadget_adj()
+
+    H, y = left_gadget_adj()
+    for _ in range(m):
+        x = _add_vertex(adj, t) # vozlišče za povezavo z osnovo
+        adj = add_gadget_adj(adj, x, H, y)
+        t = x
+
+    if srednji:
+        H, x, y = middle_gadget_adj()
+        adj, t = add_gadget_adj(adj, t, H, x, y)
+
+    H, y = left_gadget_adj() if levi_konec else right_gadget_adj()
+    return add_gadget_adj(adj, t, H, y)
+
+
+def tree_adj(k):
+    """
+    Drevo na k vozliščih (glej funkcije2.tree).
+
+    Vrne:
+        adj    ... seznam sosedov drevesa
+        leaves ... seznam listov v vrstnem redu nastanka
+    """
+
+    if k % 2 != 0 or k < 4:
+        raise ValueError("k mora biti sodo in k >= 4.")
+
+    # koren 0 s tremi otroki
+    adj = [[1, 2, 3], [0], [0], [0]]
+    leaves = deque([1, 2, 3])
+
+    # razvejimo najstarejši list
+    while len(adj) < k:
+        v = leaves.popleft()
+        a = _add_vertex(adj, v)
+        b = _add_vertex(adj, v)
+        leaves.append(a)
+        leaves.append(b)
+
+    return adj, list(leaves)
+
+
+def build_tree_adj(n):
+    """Seznam sosedov grafa Tree (glej funkcije2.build_tree)."""
+
+    _check_tree_n(n)
+
+    mod = n % 6
+    levi_prvi = mod in (0, 4)
+    levi_drugi = mod == 4
+
+    k = 4 + 2 * ((n - 16) // 6)
+
+    adj, leaves = tree_adj(k)
+    H1, t11, t12 = left_gadget2_adj()
+    H2, t21, t22 = right_gadget2_adj()
+
+    for i, t in enumerate(leaves):
+        levi = levi_prvi if i == 0 else levi_drugi if i == 1 else True
+        if levi:
+            adj = add_gadget2_adj(adj, t, H1, t11, t12)
+        else:
+            adj = add_gadget2_adj(adj, t, H2, t21, t22)
+
+    return adj
+
+
+def to_sage_graph(adj, labels=None):
+    """Pretvori seznam sosedov v Sage Graph (z oznakami labels, če jih podamo)."""
+
+    from sage.all import Graph
+
+    if labels is None:
+        labels = range(len(adj))
+    G = Graph()
+    G.add_vertices(labels)
+    G.add_edges((labels[u], labels[v]) for u, a in enumerate(adj) for v in a if u < v)
+    return G
+
+
+#--------------------------------------------------------------------------------
+# graph6
+#--------------------------------------------------------------------------------
+
+def graph6_to_adj(s):
+    """Prebere graf v zapisu graph6 in vrne seznam sosedov."""
+
+    if isinstance(s, bytes):
+        s = s.decode("ascii")
+    s = s.strip()
+    if s.startswith(">>graph6<<"):
+        s = s[10:]
+
+    data = [ord(c) - 63 for c in s]
+    if data[0] < 63:
+        n, pos = data[0], 1
+    elif data[1] < 63:
+        n, pos = (data[1] << 12) | (data[2] << 6) | data[3], 4
+    else:
+        n = 0
+        for x in data[2:8]:
+            n = (n << 6) | x
+        pos = 8
+
+    if n < 63:
+        return _decode_small(n, data, pos)
+
+    adj = [[] for _ in range(n)]
+    # biti zgornjega trikotnika po stolpcih: (0,1), (0,2), (1,2), (0,3), ...
+    i, j = 0, 1
+    for x in data[pos:]:
+        for shift in range(5, -1, -1):
+            if j >= n:
+                return adj
+            if (x >> shift) & 1:
+                adj[i].append(j)
+                adj[j].append(i)
+            i += 1
+            if i == j:
+                i, j = 0, j + 1
+
+    return adj
+
+
+@lru_cache(maxsize=None)
+def _graph6_table(n):
+    """
+    Za vsak znak telesa graph6 (n < 63) in vsako njegovo vrednost 0..63
+    vrne seznam robov, ki jih ta znak zapiše.
+    """
+
+    pairs = [(i, j) for j in range(1, n) for i in range(j)]
+    table = []
+    for p in range(0, len(pairs), 6):
+        chunk = pairs[p:p + 6]
+        table.append([
+            [chunk[b] for b in range(len(chunk)) if (x >> (5 - b)) & 1]
+            for x in range(64)
+        ])
+    return table
+
+
+def _decode_small(n, data, pos):
+    """Telo graph6 (vrednosti znakov data[pos:]) za n < 63 s tabelo robov."""
+
+    adj = [[] for _ in range(n)]
+    for row, x in zip(_graph6_table(n), data[pos:]):
+        for i, j in row[x]:
+            adj[i].append(j)
+            adj[j].append(i)
+    return adj
+
+
+def _decode_line(line):
+    """Hitro dekodiranje ene vrstice graph6 (bytes, brez glave) za n < 63."""
+
+    n = line[0] - 63
+    adj = [[] for _ in range(n)]
+    for row, c in zip(_graph6_table(n), line[1:]):
+        for i, j in row[c - 63]:
+            adj[i].append(j)
+            adj[j].append(i)
+    return adj
+
+
+def find_geng():
+    """
+    Vrne pot do programa geng (nauty) ali None. Najprej ga iščemo v PATH
+    (tudi pod imenom nauty-geng, kot ga namestijo distribucije), sicer
+    vzamemo tistega, ki ga priloži Sage.
+    """
+
+    for name in ("geng", "nauty-geng"):
+        path = shutil.which(name)
+        if path:
+            return path
+
+    try:
+        from sage.features.nauty import NautyExecutable
+        return NautyExecutable("geng").absolute_filename()
+    except Exception:
+        return None
+
+
+def cubic_graph6_lines(n, res=None, mod=None, geng=None):
+    """
+    Generator vrstic graph6 (bytes) vseh povezanih kubičnih grafov na n
+    vozliščih, prebranih neposredno iz izhoda geng (brez Sage).
+    Pomen res in mod je enak kot pri funkcije2.cubic_graphs.
+    """
+
+    if n % 2 or n < 4:
+        raise ValueError("n mora biti sodo in ≥ 4.")
+
+    args = [geng or find_geng(), "-d3", "-D3", "-c", "-q", str(n)]
+    if args[0] is None:
+        raise RuntimeError("Programa geng ni mogoče najti.")
+    if mod is not None or res is not None:
+        # res in mod podamo le skupaj
+        if res is None or mod is None or not 0 <= res < mod:
+            raise ValueError("Veljati mora 0 <= res < mod.")
+        args.append(f"{res}/{mod}")
+
+    # argumente preverimo ob klicu, ne šele ob prvem next()
+    return _geng_lines(args)
+
+
+def _geng_lines(args):
+    """
+    Generator vrstic izhoda geng z argumenti args. Če se geng konča z
+    napako, sproži RuntimeError z njegovim izpisom na stderr, da delnega
+    izhoda ne vzamemo za celotnega.
+    """
+
+    # stderr pišemo v začasno datoteko, da se ob branju stdout ne zatakne
+    with tempfile.TemporaryFile() as err:
+        proc = subprocess.Popen(args, stdout=subprocess.PIPE, stderr=err,
+                                bufsize=1 << 16)
+        finished = False
+        try:
+            for line in proc.stdout:
+                yield line.rstrip()
+            finished = True
+        finally:
+            # če bralec konča prej, geng ustavimo
+            proc.stdout.close()
+            if not finished and proc.poll() is None:
+                proc.kill()
+            status = proc.wait()
+
+        if status != 0:
+            err.seek(0)
+            message = err.read().decode(errors="replace").strip()
+            raise RuntimeError(f"geng se je končal s kodo {status}: {message}")
+
+
+def read_graph6_lines(source):
+    """
+    Generator vrstic graph6 (bytes) iz datoteke (pot ali odprta binarna
+    datoteka, npr. shranjen izhod geng). Prazne vrstice in glavo
+    >>graph6<< preskočimo.
+    """
+
+    f = open(source, "rb") if isinstance(source, (str, os.PathLike)) else source
+    try:
+        for line in f:
+            line = line.strip()
+            if line.startswith(b">>graph6<<"):
+                line = line[10:]
+            if line:
+                yield line
+    finally:
+        if f is not source:
+            f.close()
+
+
+def graph6_batches(lines, batch_size=1024):
+    """
+    Vrstice graph6 (bytes) dekodira v sezname sosedov in jih vrača v paketih
+    seznamov parov (vrstica, adj), največ batch_size naenkrat.
+    """
+
+    batch = []
+    for line in lines:
+        if line[0] < 126:
+            adj = _decode_line(line)
+        else:
+            adj = graph6_to_adj(line)
+        batch.append((line, adj))
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def adj_to_graph6(adj):
+    """Vrne zapis graph6 grafa s seznamom sosedov adj."""
+
+    n = len(adj)
+    if n < 63:
+        out = [n]
+    elif n < 258048:
+        out = [63, (n >> 12) & 63, (n >> 6) & 63, n & 63]
+    else:
+        out = [63, 63] + [(n >> s) & 63 for s in range(30, -1, -6)]
+
+    nbrs = [set(a) for a in adj]
+    x = 0
+    k = 0
+    for j in range(1, n):
+        a = nbrs[j]
+        for i in range(j):
+            x = (x << 1) | (i in a)
+            k += 1
+            if k == 6:
+                out.append(x)
+                x = k = 0
+    if k:
+        out.append(x << (6 - k))
+
+    return "".join(chr(c + 63) for c in out)
+
+
+def _is_connected(adj):
+    """Ali je graf s seznamom sosedov adj povezan."""
+
+    if not adj:
+        return True
+    seen = [False] * len(adj)
+    seen[0] = True
+    Q = deque([0])
+    count = 1
+    while Q:
+        u = Q.popleft()
+        for w in adj[u]:
+            if not seen[w]:
+                seen[w] = True
+                count += 1
+                Q.append(w)
+    return count == len(adj)
+
+
+#--------------------------------------------------------------------------------
+# Štetje poti
+#--------------------------------------------------------------------------------
+
+# Pri method="auto": do AUTO_DFS_MAX_N vozlišč vedno DFS (prevedeno jedro je
+# hitro), sicer DP po fronti, če širina fronte ne presega n // 4 (a vsaj 8 in
+# največ FRONTIER_MAX_WIDTH), oz. razcep na bloke, če noben blok nima več kot
+# BLOCKS_MAX_SIZE vozlišč. Meje so izmerjene na naključnih kubičnih grafih:
+# pri n = 34 in širini 9 je DFS še hitrejši, pri n = 40 in širini 10 ne več.
+AUTO_DFS_MAX_N = 24
+FRONTIER_MAX_WIDTH = 14
+BLOCKS_MAX_SIZE = 24
+
+# načini štetja, ki jih poznata count_paths in funkcije2.subpath_number
+METHODS = ("auto", "dfs", "blocks", "frontier", "orbits")
+
+
+def choose_method(adj):
+    """
+    Izbere način štetja za count_paths(method="auto"): "dfs" za majhne
+    grafe, "frontier" za grafe z ozko fronto (npr. Ln, gosenice),
+    "blocks" za grafe iz majhnih blokov, povezanih z mostovi (npr. drevesa
+    gradnikov), sicer "dfs".
+    """
+
+    if len(adj) <= AUTO_DFS_MAX_N:
+        return "dfs"
+    n = len(adj)
+    _, width = _frontier_order(adj)
+    if width <= min(FRONTIER_MAX_WIDTH, max(8, n // 4)):
+        return "frontier"
+    if max(map(len, _biconnected_blocks(adj)), default=0) <= BLOCKS_MAX_SIZE:
+        return "blocks"
+    return "dfs"
+
+
+def check_method(method):
+    """Sproži ValueError, če method ni eden od načinov iz METHODS."""
+
+    if method not in METHODS:
+        raise ValueError(f"Neznan način štetja: {method!r}.")
+
+
+def count_paths(adj, method="dfs", limit=None):
+    """
+    Število vseh poti (vključno s trivialnimi) v grafu s seznamom sosedov
+    adj; pomen argumentov method in limit je enak kot pri
+    funkcije2.subpath_number.
+    """
+
+    check_method(method)
+    if method == "auto":
+        method = choose_method(adj)
+
+    if method == "dfs":
+        total = _count_paths(adj, limit)
+    elif method == "blocks":
+        total = _count_paths_blocks(adj)
+    elif method == "frontier":
+        total = _count_paths_frontier(adj)
+    else:
+        total = _count_paths_orbits(adj, limit=limit)
+
+    if limit is not None and total >= limit:
+        return limit
+    return total
+
+
+def path_statistics(adj, lengths=True, starts=True, edges=True):
+    """
+    V enem prehodu čez vse (usmerjene) poti vrne slovar s statistikami:
+        "pn"        ... število vseh poti (kot count_paths)
+        "lengths"   ... lengths[k] = število poti s k povezavami
+        "starts"    ... starts[v] = število poti z začetkom v v
+        "edges"     ... edges[i] = število poti, ki vsebujejo rob edge_list[i]
+        "edge_list" ... robovi (u, v), u < v, v vrstnem redu za "edges"
+    Tabele so NumPy tabele (int64 oz. object, če števila ne gredo v int64);
+    statistike, ki jih ne želimo, izpustimo z lengths/starts/edges=False.
+
+    Iz vsakega vozlišča s naredimo DFS po vseh poteh; vozlišče DFS drevesa
+    je pot z začetkom v s. Poti skozi rob, po katerem smo prišli v vozlišče
+    DFS drevesa, so ravno poti v njegovem poddrevesu, zato število poti skozi
+    robove dobimo iz velikosti poddreves, brez dodatnega naštevanja.
+    """
+
+    import numpy as np
+
+    n = len(adj)
+    edge_list = sorted({(min(u, v), max(u, v)) for u in range(n) for v in adj[u]})
+    index = {e: i for i, e in enumerate(edge_list)}
+    # eids[u][i] je indeks roba (u, adj[u][i])
+    eids = [[index[(min(u, v), max(u, v))] for v in adj[u]] for u in range(n)]
+
+    length_counts = [0] * max(n, 1)
+    start_counts = [0] * n
+    edge_counts = [0] * len(edge_list)
+
+    for s in range(n):
+        # sklad DFS: vozlišče, maska obiskanih, naslednji sosed, velikost
+        # poddrevesa, rob, po katerem smo prišli
+        verts = [s]
+        masks = [1 << s]
+        pos = [0]
+        sizes = [1]
+        via = [-1]
+        if lengths:
+            length_counts[0] += 1
+
+        while verts:
+            u = verts[-1]
+            i = pos[-1]
+            if i < len(adj[u]):
+                pos[-1] = i + 1
+                w = adj[u][i]
+                bit = 1 << w
+                if not masks[-1] & bit:
+                    if lengths:
+                        length_counts[len(verts)] += 1
+                    verts.append(w)
+                    masks.append(masks[-1] | bit)
+                    pos.append(0)
+                    sizes.append(1)
+                    via.append(eids[u][i])
+            else:
+                verts.pop()
+                masks.pop()
+                pos.pop()
+                size = sizes.pop()
+                e = via.pop()
+                if e >= 0:
+                    sizes[-1] += size
+                    if edges:
+                        edge_counts[e] += size
+                else:
+                    start_counts[s] = size
+
+    def array(values):
+        big = values and max(values) >= 2 ** 63
+        return np.array(values, dtype=object if big else np.int64)
+
+    out = {"pn": sum(start_counts), "edge_list": edge_list}
+    if lengths:
+        out["lengths"] = array(length_counts)
+    if starts:
+        out["starts"] = array(start_counts)
+    if edges:
+        out["edges"] = array(edge_counts)
+    return out
+
+
+def _apply_swap(adj, removed, added):
+    """V seznamu sosedov adj odstrani robove removed in doda robove added."""
+
+    for u, v in removed:
+        adj[u].remove(v)
+        adj[v].remove(u)
+    for u, v in added:
+        adj[u].append(v)
+        adj[v].append(u)
+
+
+def _swap_delta(adj, removed, added, limit=None):
+    """
+    Kot subpath_number_delta, le da je adj seznam sosedov grafa PO
+    zamenjavi, robovi pa so podani z indeksi. Na koncu adj predstavlja
+    isti graf kot na začetku (vrstni red sosedov se lahko spremeni).
+    """
+
+    if not removed and not added:
+        return 0 if limit is None or 0 < limit else limit
+
+    # poti skozi odstranjene robove v grafu pred zamenjavo
+    _apply_swap(adj, added, removed)
+    lost = _count_paths_through_any(adj, removed)
+
+    # poti skozi dodane robove v grafu po zamenjavi
+    _apply_swap(adj, removed, added)
+
+    if limit is None:
+        gained = _count_paths_through_any(adj, added)
+    else:
+        # razlika doseže limit, ko gained doseže lost + ceil(limit / 2)
+        cap = lost - (-limit // 2)
+        if cap <= 0:
+            return limit
+        gained = _count_paths_through_any(adj, added, cap)
+        if gained >= cap:
+            return limit
+
+    # vsako neusmerjeno pot štejemo v obe smeri
+    return 2 * (gained - lost)
+
+
+def _count_paths_through_any(adj, edges, cap=None):
+    """
+    Prešteje neusmerjene poti, ki uporabijo vsaj enega od robov `edges`.
+
+    Pot štejemo pri prvem robu iz seznama, ki ga uporabi: za i-ti rob
+    štejemo poti v grafu brez robov 0..i-1. Seznam sosedov adj se med
+    štetjem začasno spremeni, na koncu pa je tak kot na začetku.
+    Če podamo cap, se štetje ustavi, ko števec doseže cap.
+    """
+
+    module = _compiled_module() if len(adj) <= 64 else None
+
+    total = 0
+    done = 0
+    for a, b in edges:
+        rest = None if cap is None else cap - total
+        if module is not None:
+            total += module.count_paths_through(adj, a, b, 0 if rest is None else rest)
+        else:
+            total += _count_paths_through(adj, a, b, rest)
+        adj[a].remove(b)
+        adj[b].remove(a)
+        done += 1
+        if cap is not None and total >= cap:
+            break
+
+    for a, b in edges[:done]:
+        adj[a].append(b)
+        adj[b].append(a)
+
+    return total
+
+
+def _count_paths_through(adj, a, b, cap=None):
+    """
+    Prešteje neusmerjene poti, ki vsebujejo rob (a, b).
+
+    Vsaka taka pot je sestavljena iz dela, ki se konča v a (ne vsebuje b),
+    in dela, ki se začne v b. Z zunanjim DFS naštejemo vse dele na strani a,
+    za vsakega pa z notranjim DFS preštejemo nadaljevanja od b.
+    Če podamo cap, se štetje ustavi, ko števec doseže cap.
+    """
+
+    total = 0
+
+    stack = [(a, (1 << a) | (1 << b))]
+    while stack:
+        if cap is not None and total >= cap:
+            break
+        x, mask = stack.pop()
+
+        # vsa nadaljevanja od b, ki se izognejo vozliščem iz mask
+        inner = [(b, mask)]
+        while inner:
+            y, m = inner.pop()
+            total += 1
+            for w in adj[y]:
+                bit = 1 << w
+                if not (m & bit):
+                    inner.append((w, m | bit))
+
+        # podaljšamo del na strani a
+        for w in adj[x]:
+            bit = 1 << w
+            if not (mask & bit):
+                stack.append((w, mask | bit))
+
+    return total
+
+
+def _adjacency(G):
+    """
+    Pretvori graf G v numerično obliko.
+
+    Vrne:
+        verts ... seznam vozlišč (indeks i ustreza vozlišču verts[i])
+        adj   ... seznam sosedov po indeksih 0..n-1
+    """
+
+    # Pretvori vozlišča v indekse 0..n-1 za učinkovitejši dostop
+    verts = list(G.vertices())
+    idx = {v: i for i, v in enumerate(verts)}
+
+    # Zgradi seznam sosedov (adjacency list)
+    adj = [[] for _ in verts]
+    for v in verts:
+        i = idx[v]
+        for w in G.neighbors(v):
+            adj[i].append(idx[w])
+
+    return verts, adj
+
+
+def _count_paths(adj, limit=None):
+    """
+    Prešteje vse poti v grafu, podanem s seznamom sosedov.
+
+    Če je na voljo prevedeno jedro (stetje_poti.pyx) in ima graf največ
+    64 vozlišč, uporabimo njega, sicer čisto Python različico.
+    Pomen argumenta limit je enak kot pri subpath_number.
+    """
+
+    n = len(adj)
+    module = _compiled_module() if n <= 64 else None
+    if module is None:
+        return _count_paths_fast(adj, limit)
+    kernel = module.count_undirected_paths
+
+    if limit is None:
+        return n + 2 * kernel(adj)
+
+    cap = _undirected_cap(n, limit)
+    if cap <= 0:
+        return limit
+    total = n + 2 * kernel(adj, cap)
+    return limit if total >= limit else total
+
+
+def _undirected_cap(n, limit):
+    """
+    Najmanjše število netrivialnih neusmerjenih poti c, pri katerem je
+    n + 2 * c >= limit.
+    """
+
+    return -((n - limit) // 2)
+
+
+def _count_paths_fast(adj, limit=None):
+    """
+    Prešteje vse poti v grafu, podanem s seznamom sosedov.
+
+    Vsako neusmerjeno pot preštejemo natanko enkrat, in sicer pri njenem
+    najmanjšem vozlišču m (po indeksu):
+      - če je m krajišče, pot najdemo z DFS iz m po vozliščih > m,
+      - če je m notranje vozlišče, pot razpade na dva kraka iz m; prvi
+        krak gre v soseda a, drugi v soseda b > a. Za vsak prvi krak
+        z gnezdenim DFS preštejemo vse druge krake.
+    Rezultat je n (trivialne poti) + 2 * število netrivialnih neusmerjenih poti.
+
+    DFS teče z eksplicitnim skladom, obiskana vozlišča (in vsa vozlišča
+    <= m) pa hranimo v bitmaski. Pomen argumenta limit je enak kot pri
+    subpath_number; števec preverjamo ob vsakem prvem kraku.
+    """
+
+    n = len(adj)
+    if limit is None:
+        cap = None
+    else:
+        cap = _undirected_cap(n, limit)
+        if cap <= 0:
+            return limit
+    bits = [1 << i for i in range(n)]
+    nbrs = [[(w, bits[w]) for w in a] for a in adj]
+    undirected = 0  # števec netrivialnih neusmerjenih poti
+
+    for m in range(n):
+        low = (1 << (m + 1)) - 1  # vozlišča <= m so prepovedana
+        first = sorted(w for w in adj[m] if w > m)
+
+        for i, a in enumerate(first):
+            second = [(b, bits[b]) for b in first[i + 1:]]
+
+            stack = [(a, low | bits[a])]
+            while stack:
+                if cap is not None and undirected >= cap:
+                    return limit
+                u, mask = stack.pop()
+                undirected += 1  # pot od m do u
+
+                # poti z m v notranjosti: drugi krak iz m skozi b
+                for b, bb in second:
+                    if not mask & bb:
+                        inner = [(b, mask | bb)]
+                        while inner:
+                            y, mk = inner.pop()
+                            undirected += 1
+                            for w, bw in nbrs[y]:
+                                if not mk & bw:
+                                    inner.append((w, mk | bw))
+
+                # podaljšamo prvi krak
+                for w, bw in nbrs[u]:
+                    if not mask & bw:
+                        stack.append((w, mask | bw))
+
+    if cap is not None and undirected >= cap:
+        return limit
+    return n + 2 * undirected
+
+
+_compiled = None  # None: še nismo poskusili, False: ni na voljo
+
+
+def _compiled_module():
+    """
+    Vrne prevedeni modul stetje_poti ali None.
+
+    Datoteko prevedemo ob prvi uporabi, s Sage (cython_import), če je Sage
+    že naložen, sicer s pyximport iz Cythona (Sage zaradi tega ne uvažamo).
+    Če prevajanje ne uspe (npr. ni prevajalnika C), ostanemo pri čisti
+    Python različici. Že prevedeno knjižnico, ki je novejša od .pyx,
+    naložimo neposredno (uvoz Cythona in pyximport traja okoli sekunde).
+    """
+
+    global _compiled
+    if _compiled is None:
+        _compiled = False
+        folder = os.path.dirname(os.path.abspath(__file__))
+        path = os.path.join(folder, "stetje_poti.pyx")
+
+        _compiled = _load_prebuilt(folder, path)
+        if _compiled:
+            return _compiled
+
+        try:
+            if "sage.all" not in sys.modules:
+                raise ImportError("Sage ni naložen.")
+            from sage.misc.cython import cython_import
+            _compiled = cython_import(path, use_cache=True, sage_namespace=False,
+                                      annotate=False)
+        except Exception:
+            try:
+                import importlib
+                import pyximport
+
+                importers = pyximport.install(language_level=3)
+                sys.path.insert(0, folder)
+                try:
+                    _compiled = importlib.import_module("stetje_poti")
+                finally:
+                    sys.path.remove(folder)
+                    pyximport.uninstall(*importers)
+            except Exception:
+                pass
+
+    return _compiled or None
+
+
+def _load_prebuilt(folder, path):
+    """
+    Naloži prevedeni stetje_poti iz mape modula ali iz mape, kamor ga
+    prevede pyximport (~/.pyxbld), če je novejši od path; sicer vrne False.
+    """
+
+    import glob
+    import importlib.machinery
+    import importlib.util
+
+    candidates = []
+    for suffix in importlib.machinery.EXTENSION_SUFFIXES:
+        candidates += glob.glob(os.path.join(folder, "stetje_poti" + suffix))
+        candidates += glob.glob(os.path.join(os.path.expanduser("~"), ".pyxbld", "lib*",
+                                             "stetje_poti" + suffix))
+
+    for lib in candidates:
+        try:
+            if os.path.getmtime(lib) < os.path.getmtime(path):
+                continue
+            spec = importlib.util.spec_from_file_location("stetje_poti", lib)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            return module
+        except Exception:
+            continue
+
+    return False
+
+
+def _biconnected_blocks(adj):
+    """
+    Razdeli graf na bloke (2-povezane komponente in mostove).
+
+    Iterativna različica Hopcroft-Tarjanovega algoritma s skladom robov,
+    da se izognemo omejitvi globine rekurzije pri dolgih verigah.
+    Vrne seznam blokov; vsak blok je urejen seznam indeksov vozlišč.
+    Izolirana vozlišča ne pripadajo nobenemu bloku.
+    """
+
+    n = len(adj)
+    disc = [-1] * n  # čas odkritja
+    low = [0] * n    # najmanjši čas, dosegljiv iz poddrevesa
+    t = 0
+    blocks = []
+
+    for r in range(n):
+        if disc[r] != -1:
+            continue
+        disc[r] = low[r] = t
+        t += 1
+
+        stack = [(r, -1, iter(adj[r]))]
+        edges = []  # sklad robov trenutne komponente
+
+        while stack:
+            u, parent, it = stack[-1]
+
+            advanced = False
+            for w in it:
+                if disc[w] == -1:
+                    # drevesni rob: gremo globlje
+                    edges.append((u, w))
+                    disc[w] = low[w] = t
+                    t += 1
+                    stack.append((w, u, iter(adj[w])))
+                    advanced = True
+                    break
+                elif w != parent and disc[w] < disc[u]:
+                    # povratni rob
+                    edges.append((u, w))
+                    low[u] = min(low[u], disc[w])
+            if advanced:
+                continue
+
+            stack.pop()
+            if stack:
+                p = stack[-1][0]
+                low[p] = min(low[p], low[u])
+
+                # p je prerezno vozlišče (ali koren) za poddrevo u -> nov blok
+                if low[u] >= disc[p]:
+                    block = set()
+                    while True:
+                        e = edges.pop()
+                        block.update(e)
+                        if e == (p, u):
+                            break
+                    blocks.append(sorted(block))
+
+    return blocks
+
+
+def _block_path_counts(adj, block):
+    """
+    Za blok (seznam vozlišč) vrne slovar P, kjer je P[u][w] število poti
+    od u do w (u != w), ki v celoti ležijo v bloku.
+
+    Enostavna pot med dvema vozliščema istega bloka bloka nikoli ne zapusti,
+    zato je dovolj DFS, omejen na vozlišča bloka.
+    """
+
+    if len(block) == 2:
+        # most
+        u, w = block
+        return {u: {w: 1}, w: {u: 1}}
+
+    inside = 0
+    for v in block:
+        inside |= 1 << v
+
+    P = {}
+    for u in block:
+        counts = dict.fromkeys(block, 0)
+
+        stack = [(u, 1 << u)]
+        while stack:
+            x, mask = stack.pop()
+            counts[x] += 1
+            for w in adj[x]:
+                bit = 1 << w
+                if (inside & bit) and not (mask & bit):
+                    stack.append((w, mask | bit))
+
+        del counts[u]  # trivialne poti štejemo posebej
+        P[u] = counts
+
+    return P
+
+
+def _count_paths_blocks(adj):
+    """
+    Prešteje vse poti z razcepom grafa na bloke.
+
+    Pot v grafu obišče zaporedje blokov vzdolž poti v drevesu blokov;
+    v vsakem bloku je netrivialen odsek med vstopnim in izstopnim
+    prereznim vozliščem. Za blok B in vozlišče v v B naj bo
+
+        g(B, v) = število netrivialnih poti, ki se začnejo v v in prvi
+                  odsek prehodijo v bloku B
+                = vsota po w v B (w != v) izrazov
+                  P_B(v, w) * (1 + vsota g(B', w) po blokih B' != B, ki vsebujejo w).
+
+    Število poti z začetkom v v je f(v) = 1 + vsota g(B, v) po blokih B,
+    ki vsebujejo v, rezultat pa je vsota f(v) po vseh vozliščih.
+    """
+
+    n = len(adj)
+    blocks = _biconnected_blocks(adj)
+    pair_counts = [_block_path_counts(adj, B) for B in blocks]
+
+    blocks_of = [[] for _ in range(n)]
+    for b, B in enumerate(blocks):
+        for v in B:
+            blocks_of[v].append(b)
+
+    g = {}
+
+    # g izračunamo brez rekurzije: odvisnosti (B', w) se vedno oddaljujejo
+    # od v po drevesu blokov, zato so brez ciklov
+    for b, B in enumerate(blocks):
+        for v in B:
+            if (b, v) in g:
+                continue
+
+            stack = [(b, v)]
+            while stack:
+                key = stack[-1]
+                if key in g:
+                    stack.pop()
+                    continue
+                cb, cv = key
+
+                missing = []
+                for w in blocks[cb]:
+                    if w == cv:
+                        continue
+                    for b2 in blocks_of[w]:
+                        if b2 != cb and (b2, w) not in g:
+                            missing.append((b2, w))
+                if missing:
+                    stack.extend(missing)
+                    continue
+
+                stack.pop()
+                P = pair_counts[cb][cv]
+                value = 0
+                for w in blocks[cb]:
+                    if w == cv:
+                        continue
+                    cont = 1
+                    for b2 in blocks_of[w]:
+                        if b2 != cb:
+                            cont += g[(b2, w)]
+                    value += P[w] * cont
+                g[key] = value
+
+    total = n  # trivialne poti
+    for v in range(n):
+        for b in blocks_of[v]:
+            total += g[(b, v)]
+
+    return total
+
+def vertex_orbits(adj):
+    """
+    Orbite vozlišč grafa s seznamom sosedov adj pod grupo avtomorfizmov
+    (izračuna jih Sage oz. nauty). Vrne seznam seznamov vozlišč.
+    """
+
+    G = to_sage_graph(adj)
+    return [list(orbit) for orbit in G.automorphism_group(orbits=True, return_group=False)]
+
+
+def _count_paths_from(adj, v):
+    """Število poti z začetkom v v (vključno s trivialno), čisti Python."""
+
+    bits = [1 << i for i in range(len(adj))]
+    total = 0
+    stack = [(v, bits[v])]
+    while stack:
+        u, mask = stack.pop()
+        total += 1
+        for w in adj[u]:
+            if not mask & bits[w]:
+                stack.append((w, mask | bits[w]))
+    return total
+
+
+def _count_paths_orbits(adj, orbits=None, limit=None):
+    """
+    Prešteje vse poti z enim DFS na orbito avtomorfizmov.
+
+    Avtomorfizem preslika poti z začetkom v v bijektivno na poti z
+    začetkom v njegovi sliki, zato imajo vsa vozlišča v orbiti enako
+    število poti f(v). Rezultat je vsota |O| * f(predstavnik O) po
+    orbitah O in je natančno enak rezultatu _count_paths. Pri limit se
+    ustavimo, ko delna vsota doseže limit.
+    """
+
+    if orbits is None:
+        orbits = vertex_orbits(adj)
+
+    module = _compiled_module() if len(adj) <= 64 else None
+    count_from = module.count_paths_from if module is not None else None
+
+    total = 0
+    # večje orbite najprej, da limit čim prej dosežemo
+    for orbit in sorted(orbits, key=len, reverse=True):
+        v = orbit[0]
+        f = count_from(adj, v) if count_from is not None else _count_paths_from(adj, v)
+        total += len(orbit) * f
+        if limit is not None and total >= limit:
+            return limit
+    return total
+
+
+def _frontier_order(adj):
+    """
+    Vrstni red vozlišč z majhno fronto (za _count_paths_frontier).
+
+    Začnemo v krajišču psevdo-premera (dvojni BFS), nato pa požrešno
+    dodajamo sosednje vozlišče, po katerem je fronta (dodana vozlišča, ki
+    imajo še kakšnega nedodanega soseda) najmanjša. Vrne (order, width),
+    kjer je width največja velikost fronte; to je širina pripadajoče
+    razčlenitve na poti (path decomposition).
+    """
+
+    n = len(adj)
+    if n == 0:
+        return [], 0
+
+    def farthest(r):
+        dist = [-1] * n
+        dist[r] = 0
+        Q = deque([r])
+        last = r
+        while Q:
+            last = u = Q.popleft()
+            for w in adj[u]:
+                if dist[w] == -1:
+                    dist[w] = dist[u] + 1
+                    Q.append(w)
+        return last
+
+    placed = [False] * n
+    missing = [len(set(a)) for a in adj]  # nedodani sosedje
+    order = []
+    candidates = set()  # nedodani sosedje dodanih vozlišč
+    frontier = 0
+    width = 0
+
+    while len(order) < n:
+        if not candidates:
+            # nova komponenta
+            start = next(v for v in range(n) if not placed[v])
+            candidates.add(farthest(farthest(start)))
+
+        best = None
+        for v in candidates:
+            # v vstopi, dodani sosedje, ki jim je v zadnji manjkajoči, izstopijo
+            nbrs = set(adj[v])
+            leaving = sum(1 for w in nbrs if placed[w] and missing[w] == 1)
+            stays = missing[v] > sum(1 for w in nbrs if placed[w])
+            key = (frontier + stays - leaving, -leaving, v)
+            if best is None or key < best:
+                best = key
+
+        v = best[2]
+        placed[v] = True
+        order.append(v)
+        candidates.discard(v)
+        candidates.update(w for w in adj[v] if not placed[w])
+        frontier += 1
+        width = max(width, frontier)
+        for w in set(adj[v]):
+            if placed[w]:
+                missing[w] -= 1
+                missing[v] -= 1
+                if missing[w] == 0:
+                    frontier -= 1
+        if missing[v] == 0:
+            frontier -= 1
+
+    return order, width
+
+
+def _normalize(codes):
+    """Preštevilči oznake fragmentov (> 0) po vrstnem redu pojavitve."""
+
+    mapping = {}
+    out = []
+    for c in codes:
+        if c > 0:
+            if c not in mapping:
+                mapping[c] = len(mapping) + 1
+            c = mapping[c]
+        out.append(c)
+    return tuple(out)
+
+
+# kode vozlišča na fronti pri _count_paths_frontier
+_FREE = 0         # stopnja 0
+_INNER = -1       # stopnja 2 (notranje vozlišče poti)
+_ANCHORED = -2    # stopnja 1, drugo krajišče fragmenta je že zaključeno krajišče poti
+
+
+def _count_paths_frontier(adj, order=None):
+    """
+    Prešteje vse poti v grafu z dinamičnim programiranjem po fronti
+    (razčlenitev na poti, ki jo določa vrstni red vozlišč order).
+
+    Vozlišča dodajamo po vrsti in za vsak rob do že dodanega vozlišča
+    odločimo, ali je v poti. Stanje so kode vozlišč na fronti:
+        0  ... stopnja 0,
+        -1 ... stopnja 2,
+        -2 ... stopnja 1, drugo krajišče fragmenta je že končno krajišče,
+        k>0 .. stopnja 1, k je oznaka fragmenta (njegovi krajišči na fronti
+               imata isto oznako),
+    skupaj s številom že zaključenih krajišč poti (največ 2). Ko vozlišče
+    zapusti fronto s stopnjo 1, postane krajišče poti; ko ima fragment obe
+    krajišči zaključeni, je pot končana (drugih fragmentov ne sme biti).
+
+    Vsako neusmerjeno pot z vsaj enim robom preštejemo natanko enkrat (kot
+    množico robov), zato je rezultat n + 2 * število. Čas je eksponenten
+    le v širini fronte, ne v n.
+    """
+
+    n = len(adj)
+    if order is None:
+        order, _ = _frontier_order(adj)
+
+    position = {v: i for i, v in enumerate(order)}
+    missing = [len(set(a)) for a in adj]
+
+    front = []               # vozlišča na fronti
+    states = {((), 0): 1}    # (kode, zaključena krajišča) -> število
+    finished = 0             # končane poti
+
+    def close(codes, i):
+        """Ali je pot končana veljavno: drugih krajišč fragmentov ni."""
+        return all(c == _FREE or c == _INNER for j, c in enumerate(codes) if j != i)
+
+    for v in order:
+        front.append(v)
+        states = {(codes + (_FREE,), ends): c for (codes, ends), c in states.items()}
+        pv = len(front) - 1
+
+        for u in sorted({w for w in adj[v] if position[w] < position[v]}, key=position.get):
+            pu = front.index(u)
+            new_states = {}
+            for (codes, ends), count in states.items():
+                # rob ni v poti
+                key = (codes, ends)
+                new_states[key] = new_states.get(key, 0) + count
+
+                cu, cv = codes[pu], codes[pv]
+                if cu == _INNER or cv == _INNER:
+                    continue
+                c = list(codes)
+                c[pu] = c[pv] = _INNER
+
+                if cu == _FREE and cv == _FREE:
+                    # nov fragment
+                    c[pu] = c[pv] = max(max(codes), 0) + 1
+                elif cu == _FREE or cv == _FREE:
+                    # podaljšamo fragment; novo krajišče prevzame kodo
+                    end, other = (pu, cv) if cu == _FREE else (pv, cu)
+                    c[end] = other
+                elif cu == _ANCHORED and cv == _ANCHORED:
+                    # fragmenta z zaključenima krajiščema se združita v pot
+                    if all(x == _FREE or x == _INNER for x in c):
+                        finished += count
+                    continue
+                elif cu == cv:
+                    continue  # cikel
+                elif cu == _ANCHORED or cv == _ANCHORED:
+                    # drugo krajišče fragmenta z oznako postane zasidrano
+                    label = cv if cu == _ANCHORED else cu
+                    c = [_ANCHORED if x == label else x for x in c]
+                else:
+                    # združimo dva fragmenta
+                    c = [cu if x == cv else x for x in c]
+
+                key = (_normalize(c), ends)
+                new_states[key] = new_states.get(key, 0) + count
+            states = new_states
+
+            missing[u] -= 1
+            missing[v] -= 1
+
+        # vozlišča, ki nimajo več nedodanih sosedov, zapustijo fronto
+        for x in [x for x in front if missing[x] == 0]:
+            i = front.index(x)
+            new_states = {}
+            for (codes, ends), count in states.items():
+                cx = codes[i]
+                rest = codes[:i] + codes[i + 1:]
+                if cx == _FREE or cx == _INNER:
+                    key = (rest, ends)
+                elif ends >= 2:
+                    continue  # tretje krajišče
+                elif cx == _ANCHORED:
+                    # obe krajišči fragmenta sta zaključeni: pot je končana
+                    if close(codes, i):
+                        finished += count
+                    continue
+                else:
+                    # x je krajišče poti; drugo krajišče fragmenta je zasidrano
+                    key = (_normalize([_ANCHORED if c == cx else c for c in rest]), ends + 1)
+                new_states[key] = new_states.get(key, 0) + count
+            states = new_states
+            front.pop(i)
+
+    return n + 2 * finished
+
+
+def _girth(adj):
+    """Vrne ožino grafa (dolžino najkrajšega cikla) ali None za gozd."""
+
+    n = len(adj)
+    best = None
+
+    # BFS iz vsakega vozlišča; prvi prečni rob da najkrajši cikel skozi koren
+    for r in range(n):
+        dist = [-1] * n
+        parent = [-1] * n
+        dist[r] = 0
+        Q = deque([r])
+        while Q:
+            u = Q.popleft()
+            if best is not None and 2 * dist[u] + 1 >= best:
+                break
+            for w in adj[u]:
+                if dist[w] == -1:
+                    dist[w] = dist[u] + 1
+                    parent[w] = u
+                    Q.append(w)
+                elif w != parent[u]:
+                    length = dist[u] + dist[w] + 1
+                    if best is None or length < best:
+                        best = length
+
+    return best
+
+
+def _girth_lower_bound(adj):
+    """Spodnja meja za število poti iz ožine in najmanjše stopnje (glej subpath_lower_bound)."""
+
+    n = len(adj)
+    if n == 0:
+        return 0
+
+    degrees = [len(a) for a in adj]
+    d = min(degrees)
+    g = _girth(adj)
+    bound = n  # trivialne poti
+
+    if d == 0:
+        return bound
+
+    # sprehodi brez vračanja dolžine 1..g-1 so poti (za gozd do dolžine n-1)
+    longest = n - 1 if g is None else g - 1
+    walks = n * d
+    for j in range(1, longest + 1):
+        bound += walks
+        walks *= d - 1
+        if walks == 0:
+            break
+
+    # ožina 3 pri regularnem grafu: poti dolžine 3 je n*d*(d-1)^2 - 6*t
+    if g == 3 and d == max(degrees):
+        triangles = 0
+        for u in range(n):
+            for v in adj[u]:
+                if v > u:
+                    triangles += len(set(adj[u]) & set(adj[v]))
+        triangles //= 3
+        bound += n * d * (d - 1) ** 2 - 6 * triangles
+
+    return bound
+
+
+def _count_short_paths(adj, k, limit=None):
+    """
+    Prešteje poti z največ k povezavami (vključno s trivialnimi).
+
+    DFS iz vsakega vozlišča, omejen na globino k; če je na voljo, v
+    prevedenem jedru. Pomen argumenta limit je enak kot pri subpath_number.
+    """
+
+    n = len(adj)
+    module = _compiled_module() if n <= 64 else None
+    if module is not None:
+        if limit is None:
+            return n + module.count_short_paths(adj, k)
+        if limit <= n:
+            return limit
+        total = n + module.count_short_paths(adj, k, limit - n)
+        return limit if total >= limit else total
+
+    total = 0
+    for s in range(n):
+        stack = [(s, 1 << s, 0)]
+        while stack:
+            u, mask, depth = stack.pop()
+            total += 1
+            if depth == k:
+                continue
+            for w in adj[u]:
+                bit = 1 << w
+                if not (mask & bit):
+                    stack.append((w, mask | bit, depth + 1))
+        if limit is not None and total >= limit:
+            return limit
+
+    return total
+
+
+#--------------------------------------------------------------------------------
+# Ocena števila poti (naključni preizkusi)
+#--------------------------------------------------------------------------------
+
+def estimate_paths(adj, samples=None, rel_error=None, seconds=None, seed=None,
+                   min_samples=30):
+    """
+    Nepristranska ocena števila vseh poti (pn) z naključnimi preizkusi
+    drevesa DFS (Knuthova cenilka).
+
+    Poti z začetkom v v so vozlišča drevesa, katerega otroci so
+    podaljšanja poti. Preizkus gre iz korena naključno navzdol in velikost
+    drevesa oceni z vsoto produktov razvejanosti (glej _probe_paths, kjer
+    so opisane tudi izboljšave, ki zmanjšajo varianco).
+    En vzorec je vsota preizkusov iz vseh vozlišč (stratificirano po
+    začetnem vozlišču), ocena pa povprečje vzorcev.
+
+    Vzorčimo, dokler ni izpolnjen eden od pogojev:
+        samples   - število vzorcev,
+        rel_error - relativna standardna napaka (stderr / ocena) je
+                    največ rel_error (po vsaj min_samples vzorcih),
+        seconds   - časovni proračun.
+    Če ne podamo nobenega, vzamemo samples=100.
+
+    Vrne (ocena, stderr, število vzorcev). Porazdelitev vzorcev ima težak
+    rep, zato je pri malo vzorcih stderr lahko podcenjen.
+    """
+
+    import math
+    import time
+
+    if samples is None and rel_error is None and seconds is None:
+        samples = 100
+
+    n = len(adj)
+    nbm = [0] * n
+    for v in range(n):
+        for w in adj[v]:
+            nbm[v] |= 1 << w
+
+    rng = random.Random(seed)
+    start = time.time()
+    count = 0
+    mean = 0.0
+    m2 = 0.0  # vsota kvadratov odmikov (Welford)
+
+    while True:
+        x = 0.0
+        for v in range(n):
+            x += _probe_paths(nbm, v, rng)
+        count += 1
+        delta = x - mean
+        mean += delta / count
+        m2 += delta * (x - mean)
+
+        stderr = math.sqrt(m2 / (count - 1) / count) if count > 1 else math.inf
+        if samples is not None and count >= samples:
+            break
+        if rel_error is not None and count >= min_samples and stderr <= rel_error * mean:
+            break
+        if seconds is not None and time.time() - start >= seconds and count > 1:
+            break
+
+    return mean, stderr, count
+
+
+def _probe_paths(nbm, v, rng):
+    """
+    En Knuthov preizkus: nepristranska ocena števila poti z začetkom v v
+    (vključno s trivialno). Sosede in obiskana vozlišča so bitne maske.
+
+    Trenutna pot ima krajišče u in množico obiskanih vozlišč seen; njena
+    podaljšanja so neobiskani sosedi u. Varianco zmanjšamo na dva načina,
+    ocena pa ostane nepristranska:
+      - podaljšanja, ki se takoj končajo (sosed nima neobiskanih sosedov),
+        štejemo natančno,
+      - ostale sosede razdelimo po komponentah grafa brez seen; v vsaki
+        komponenti enakomerno izberemo enega (utež pomnožimo s številom
+        sosedov v njej), nadaljujemo pa v vseh komponentah. Poti iz
+        različnih komponent so disjunktne, zato preizkus skupaj obišče
+        največ n vozlišč, pri drevesih gradnikov in gosenicah pa se tako
+        izognemo redkim, a ogromnim poddrevesom.
+    """
+
+    total = 1.0
+    stack = [(v, 1 << v, 1.0)]
+    while stack:
+        u, seen, weight = stack.pop()
+        while True:
+            free = nbm[u] & ~seen
+            inner = []
+            leaves = 0
+            while free:
+                bit = free & -free
+                free ^= bit
+                w = bit.bit_length() - 1
+                if nbm[w] & ~(seen | bit):
+                    inner.append(w)
+                else:
+                    leaves += 1
+
+            total += weight * leaves
+            if not inner:
+                break
+
+            groups = []
+            for w in inner:
+                for group in groups:
+                    if _same_component(nbm, seen, group[0], w):
+                        group.append(w)
+                        break
+                else:
+                    groups.append([w])
+
+            # ostale komponente nadaljujemo kasneje, v prvi takoj
+            for group in groups[1:]:
+                c = group[rng.randrange(len(group))]
+                w_c = weight * len(group)
+                total += w_c
+                stack.append((c, seen | (1 << c), w_c))
+
+            group = groups[0]
+            u = group[rng.randrange(len(group))]
+            weight *= len(group)
+            total += weight
+            seen |= 1 << u
+
+    return total
+
+
+def _same_component(nbm, seen, a, b):
+    """
+    Ali sta a in b v isti komponenti grafa brez vozlišč iz seen? Hkratni
+    BFS iz obeh se ustavi, ko se srečata ali ko se ena komponenta izčrpa,
+    zato je cena omejena z manjšo od obeh.
+    """
+
+    A = front_a = 1 << a
+    B = front_b = 1 << b
+    while front_a and front_b:
+        front_a = _expand_mask(nbm, front_a) & ~seen & ~A
+        if front_a & B:
+            return True
+        A |= front_a
+
+        front_b = _expand_mask(nbm, front_b) & ~seen & ~B
+        if front_b & A:
+            return True
+        B |= front_b
+    return False
+
+
+def _expand_mask(nbm, mask):
+    """Unija sosedov vozlišč iz maske mask."""
+
+    out = 0
+    while mask:
+        bit = mask & -mask
+        mask ^= bit
+        out |= nbm[bit.bit_length() - 1]
+    return out
+
+
+#--------------------------------------------------------------------------------
+# Kubična double-edge swap poteza
+#--------------------------------------------------------------------------------
+
+# Števci neuspelih poskusov zamenjave (po razlogih) v tem procesu; povečujeta
+# jih CubicGraph.random_swap in metahevristika.random_cubic_swap.
+#   same_edge     ... dvakrat izbran isti rob
+#   shared_vertex ... roba imata skupno vozlišče
+#   parallel_edge ... zamenjava bi naredila vzporedni rob
+#   disconnected  ... graf po zamenjavi ni povezan
+#   exhausted     ... v max_tries poskusih ni bilo veljavne zamenjave
+SWAP_FAILURES = dict.fromkeys(
+    ("same_edge", "shared_vertex", "parallel_edge", "disconnected", "exhausted"), 0
+)
+
+class CubicGraph:
+    """
+    Kompakten spremenljiv kubični graf za hitre double-edge swap poteze.
+
+    Vozlišča so 0..n-1, prvotne oznake hranimo v labels.
+        nbr[v] ... seznam treh sosedov vozlišča v
+        edges  ... seznam robov (u, v); zamenjava v njem prepiše dva vnosa
+
+    random_swap naredi zamenjavo na mestu (brez kopiranja grafa) in si
+    zapomni, kako jo razveljaviti (undo). Povezanost po zamenjavi preverimo
+    le lokalno (glej _connected_after_swap).
+    """
+
+    def __init__(self, nbr, labels=None):
+        self.n = len(nbr)
+        self.nbr = [list(a) for a in nbr]
+        self.labels = list(labels) if labels is not None else list(range(self.n))
+        self.edges = [(u, v) for u in range(self.n) for v in self.nbr[u] if u < v]
+        self._undo = None
+
+    @classmethod
+    def from_graph(cls, G):
+        """Pretvori povezan kubičen Sage graf v CubicGraph."""
+
+        assert G.is_regular(3), "Graf ni kubičen (3-regularen)."
+        assert G.is_connected(), "Graf ni povezan."
+
+        verts, adj = _adjacency(G)
+        return cls(adj, verts)
+
+    @classmethod
+    def from_graph6(cls, s):
+        """Prebere povezan kubičen graf iz graph6 zapisa (brez Sage)."""
+
+        adj = graph6_to_adj(s)
+        assert all(len(a) == 3 for a in adj), "Graf ni kubičen (3-regularen)."
+        assert _is_connected(adj), "Graf ni povezan."
+        return cls(adj)
+
+    def to_graph(self):
+        """Vrne Sage Graph s prvotnimi oznakami vozlišč."""
+
+        return to_sage_graph(self.nbr, self.labels)
+
+    def graph6_string(self):
+        # vozlišča v graph6 so v vrstnem redu labels, kot pri Sage
+        return adj_to_graph6(self.nbr)
+
+    def copy(self):
+        H = CubicGraph.__new__(CubicGraph)
+        H.n = self.n
+        H.nbr = [list(a) for a in self.nbr]
+        H.labels = self.labels  # oznak ne spreminjamo, lahko jih delimo
+        H.edges = list(self.edges)
+        H._undo = None
+        return H
+
+    def has_edge(self, u, v):
+        return v in self.nbr[u]
+
+    def random_swap(self, max_tries=500, rng=None):
+        """
+        Naredi naključno double-edge swap zamenjavo, po kateri graf ostane
+        povezan in enostaven (kot random_cubic_neighbor), in vrne
+            removed, added
+        (seznama robov z indeksi vozlišč). Če v max_tries poskusih ne najde
+        primerne zamenjave, grafa ne spremeni in vrne ([], []).
+
+        Naključna števila jemljemo iz rng (random.Random), privzeto iz
+        modula random.
+        """
+
+        if rng is None:
+            rng = random
+        edges = self.edges
+        nbr = self.nbr
+        m = len(edges)
+        failures = SWAP_FAILURES
+        self._undo = None
+        if m < 2:
+            return [], []
+
+        for _ in range(max_tries):
+
+            # izberemo dva različna roba
+            i = rng.randrange(m)
+            j = rng.randrange(m)
+            if i == j:
+                failures["same_edge"] += 1
+                continue
+            (u, v) = edges[i]
+            (x, y) = edges[j]
+
+            # potrebujemo 4 različna vozlišča (disjunktna roba)
+            if u == x or u == y or v == x or v == y:
+                failures["shared_vertex"] += 1
+                continue
+
+            # izberemo eno od dveh možnih zamenjav
+            if rng.random() < 0.5:
+                a, b = u, x
+                c, d = v, y
+            else:
+                a, b = u, y
+                c, d = v, x
+
+            # brez paralelnih robov
+            if b in nbr[a] or d in nbr[c]:
+                failures["parallel_edge"] += 1
+                continue
+
+            # izvedemo zamenjavo na mestu
+            removed = [(u, v), (x, y)]
+            added = [(a, b), (c, d)]
+            self._swap(i, j, removed, added)
+
+            if self._connected_after_swap(u, v, x, y):
+                self._undo = (i, j, removed, added)
+                return removed, added
+
+            # razveljavi in poskusi z drugim switchom
+            failures["disconnected"] += 1
+            self._swap(i, j, added, removed)
+
+        failures["exhausted"] += 1
+        return [], []
+
+    def swaps(self):
+        """
+        Vrne seznam vseh zamenjav (i, j, removed, added), po katerih graf
+        ostane povezan in enostaven; vsak par disjunktnih robov da največ
+        dve. Graf na koncu ostane nespremenjen.
+        """
+
+        edges = self.edges
+        nbr = self.nbr
+        moves = []
+        for i in range(len(edges)):
+            u, v = edges[i]
+            for j in range(i + 1, len(edges)):
+                x, y = edges[j]
+                if u == x or u == y or v == x or v == y:
+                    continue
+                for a, b, c, d in ((u, x, v, y), (u, y, v, x)):
+                    if b in nbr[a] or d in nbr[c]:
+                        continue
+                    removed = [(u, v), (x, y)]
+                    added = [(a, b), (c, d)]
+                    self._swap(i, j, removed, added)
+                    if self._connected_after_swap(u, v, x, y):
+                        moves.append((i, j, removed, added))
+                    self._swap(i, j, added, removed)
+        return moves
+
+    def last_move(self):
+        """
+        Zadnja zamenjava (i, j, removed, added) iz random_swap ali
+        apply_swap oz. None, če je ni ali je že razveljavljena; lahko jo
+        kasneje ponovno izvedemo z apply_swap.
+        """
+
+        return self._undo
+
+    def apply_swap(self, move):
+        """
+        Ponovno izvede zamenjavo move = (i, j, removed, added), kot jo
+        zapiše random_swap (npr. izbrano izmed več razveljavljenih kandidatov).
+        """
+
+        i, j, removed, added = move
+        self._swap(i, j, removed, added)
+        self._undo = move
+
+    def undo(self):
+        """Razveljavi zadnjo zamenjavo iz random_swap."""
+
+        if self._undo is not None:
+            i, j, removed, added = self._undo
+            self._swap(i, j, added, removed)
+            self._undo = None
+
+    def _swap(self, i, j, removed, added):
+        """Robova removed (na mestih i, j v edges) zamenja z robovoma added."""
+
+        nbr = self.nbr
+        for p, q in removed:
+            nbr[p].remove(q)
+            nbr[q].remove(p)
+        for p, q in added:
+            nbr[p].append(q)
+            nbr[q].append(p)
+        self.edges[i] = added[0]
+        self.edges[j] = added[1]
+
+    def _connected_after_swap(self, u, v, x, y):
+        """
+        Preveri, ali je graf po zamenjavi še povezan.
+
+        Pred zamenjavo je bil graf povezan, zato vsaka komponenta grafa brez
+        odstranjenih robov vsebuje enega od krajišč u, v, x, y. Graf je torej
+        povezan natanko tedaj, ko so vsa štiri krajišča v isti komponenti;
+        BFS iz u ustavimo takoj, ko jih najdemo.
+        """
+
+        targets = {v, x, y}
+        seen = {u}
+        Q = deque([u])
+        while Q:
+            p = Q.popleft()
+            for q in self.nbr[p]:
+                if q not in seen:
+                    if q in targets:
+                        targets.discard(q)
+                        if not targets:
+                            return True
+                    seen.add(q)
+                    Q.append(q)
+        return False
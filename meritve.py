@@ -0,0 +1,340 @@
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+
+# Moduli, katerih čas uvoza merimo (vsak v svežem procesu)
+IMPORT_TARGETS = ("jedro", "funkcije2", "metahevristika", "pregled", "sage.all")
+
+
+def import_time(module, repeats=3):
+    """
+    Vrne najkrajši čas (v sekundah) uvoza modula v svežem Python procesu.
+
+    Tako izmerimo, koliko plača vsak delovni proces (npr. v Pool), preden
+    lahko začne z delom. Drugi vrnjeni podatek pove, ali je uvoz naložil
+    tudi Sage.
+    """
+
+    folder = os.path.dirname(os.path.abspath(__file__))
+    code = (
+        "import sys, time\n"
+        "t = time.perf_counter()\n"
+        f"import {module}\n"
+        "print(time.perf_counter() - t, 'sage.all' in sys.modules)\n"
+    )
+
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(p for p in (folder, env.get("PYTHONPATH")) if p)
+
+    best = None
+    for _ in range(repeats):
+        out = subprocess.run([sys.executable, "-c", code], cwd=folder, env=env,
+                             capture_output=True, text=True, check=True).stdout.split()
+        seconds, sage = float(out[0]), out[1] == "True"
+        best = seconds if best is None else min(best, seconds)
+
+    return best, sage
+
+
+def import_benchmark(modules=IMPORT_TARGETS, repeats=3, verbose=True):
+    """
+    Izmeri čas uvoza za vse module in vrne seznam slovarjev
+        {"module": ..., "seconds": ..., "loads_sage": ...}.
+    Moduli, ki jih ni mogoče uvoziti, imajo seconds = None.
+    """
+
+    results = []
+    for module in modules:
+        try:
+            seconds, sage = import_time(module, repeats)
+        except subprocess.CalledProcessError:
+            seconds, sage = None, None
+        results.append({"module": module, "seconds": seconds, "loads_sage": sage})
+
+        if verbose:
+            if seconds is None:
+                print(f"{module:16s} uvoz ni uspel")
+            else:
+                print(f"{module:16s} {seconds:8.3f} s   Sage: {'da' if sage else 'ne'}")
+
+    return results
+
+
+# ============================================================
+# Zbirka meritev
+# ------------------------------------------------------------
+# run_benchmarks izmeri:
+#   - čas uvoza modulov (import_benchmark),
+#   - subpath_number na Ln, Cat1, Tree in naključnih kubičnih grafih,
+#   - konstrukcije družin (Sage grafi in seznami sosedov) do velikih n,
+#   - korake na sekundo za simulated_annealing_subpath,
+#   - grafe na sekundo pri izčrpnem pregledu (scan_cubic_graphs).
+# Rezultat je slovar, ki ga shranimo v JSON; dve datoteki primerjamo s
+# compare_benchmarks. Naključnost je določena s semenom, zato so meritve
+# med različicami primerljive.
+# ============================================================
+
+COUNTING_N = (12, 14, 16, 18, 20, 22, 24)
+CONSTRUCTION_N = (100, 1000, 10000)
+ADJ_CONSTRUCTION_N = (1000, 10000, 100000)
+SA_N = (16, 20, 24)
+SCAN_N = (14, 16, 18)
+
+
+def _timed(fun, repeats=3):
+    """Vrne (najkrajši čas v sekundah, rezultat zadnjega klica)."""
+
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fun()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def random_cubic_adj(n, seed=0, swaps=None):
+    """
+    Naključen povezan kubičen graf (seznam sosedov): iz Ln naredimo
+    swaps (privzeto 10 n) naključnih double-edge swap zamenjav.
+    """
+
+    from jedro import CubicGraph, Ln_adj
+
+    state = random.getstate()
+    random.seed(seed)
+    try:
+        H = CubicGraph(Ln_adj(n))
+        for _ in range(10 * n if swaps is None else swaps):
+            H.random_swap()
+    finally:
+        random.setstate(state)
+    return H.nbr
+
+
+def counting_benchmark(n_values=COUNTING_N, repeats=3, verbose=True):
+    """
+    Čas subpath_number na družinah in naključnih kubičnih grafih
+    (seconds, s Sage grafom) in čas samega štetja na seznamu sosedov
+    (core_seconds, jedro.count_paths).
+    """
+
+    from funkcije2 import subpath_number
+    from jedro import Ln_adj, build_caterpillar_adj, build_tree_adj, count_paths, to_sage_graph
+
+    families = {
+        "Ln": Ln_adj,
+        "Cat1": build_caterpillar_adj,
+        "Tree": build_tree_adj,
+        "random": random_cubic_adj,
+    }
+
+    results = []
+    for name, build in families.items():
+        for n in n_values:
+            if name == "Tree" and n < 16:
+                continue
+            adj = build(n)
+            G = to_sage_graph(adj)
+            seconds, pn = _timed(lambda: subpath_number(G), repeats)
+            core_seconds, _ = _timed(lambda: count_paths(adj), repeats)
+            results.append({"family": name, "n": n, "pn": pn, "seconds": seconds,
+                            "core_seconds": core_seconds})
+            if verbose:
+                print(f"štetje  {name:6s} n={n:3d}  pn={pn:<10d} {seconds:9.5f} s"
+                      f"  (jedro {core_seconds:9.5f} s)")
+
+    return results
+
+
+def construction_benchmark(n_values=CONSTRUCTION_N, adj_n_values=ADJ_CONSTRUCTION_N,
+                           repeats=3, verbose=True):
+    """Čas konstrukcij družin kot Sage grafov (funkcije2) in seznamov sosedov (jedro)."""
+
+    import funkcije2
+    import jedro
+
+    builders = [
+        ("sage", "Ln", funkcije2.Ln_graph, n_values),
+        ("sage", "Cat1", funkcije2.build_caterpillar, n_values),
+        ("sage", "Cat2", funkcije2.build_caterpillar2, n_values),
+        ("sage", "Tree", funkcije2.build_tree, n_values),
+        ("adj", "Ln", jedro.Ln_adj, adj_n_values),
+        ("adj", "Cat1", jedro.build_caterpillar_adj, adj_n_values),
+        ("adj", "Cat2", jedro.build_caterpillar2_adj, adj_n_values),
+        ("adj", "Tree", jedro.build_tree_adj, adj_n_values),
+    ]
+
+    results = []
+    for kind, name, build, ns in builders:
+        for n in ns:
+            try:
+                seconds, _ = _timed(lambda: build(n), repeats)
+            except ImportError:
+                seconds = None  # Sage ni na voljo
+            results.append({"kind": kind, "family": name, "n": n, "seconds": seconds})
+            if verbose and seconds is not None:
+                print(f"gradnja {kind:4s} {name:5s} n={n:6d}  {seconds:9.5f} s")
+
+    return results
+
+
+def annealing_benchmark(n_values=SA_N, steps=2000, seed=0, verbose=True):
+    """Korakov na sekundo za simulated_annealing_subpath, začetek v Ln."""
+
+    from funkcije2 import Ln_graph
+    from metahevristika import simulated_annealing_subpath
+
+    results = []
+    for n in n_values:
+        random.seed(seed)
+        G = Ln_graph(n)
+        start = time.perf_counter()
+        _, best_E, _ = simulated_annealing_subpath(G, steps=steps)
+        seconds = time.perf_counter() - start
+        results.append({"n": n, "steps": steps, "best_E": best_E, "seconds": seconds,
+                        "steps_per_s": steps / seconds})
+        if verbose:
+            print(f"SA      n={n:3d}  {steps / seconds:9.1f} korakov/s  best_E={best_E}")
+
+    return results
+
+
+def scan_benchmark(n_values=SCAN_N, processes=None, verbose=True):
+    """
+    Grafov na sekundo pri izčrpnem pregledu, prag je pn(Ln) (kot pri
+    datotekah Data/boljsi_Ln_n*.csv).
+    """
+
+    from formule import pn_Ln
+    from pregled import scan_cubic_graphs
+
+    results = []
+    for n in n_values:
+        threshold = pn_Ln(n)
+        start = time.perf_counter()
+        rows, stats = scan_cubic_graphs(n, threshold, processes=processes)
+        seconds = time.perf_counter() - start
+        graphs = sum(st["graphs"] for st in stats)
+        results.append({"n": n, "threshold": threshold, "graphs": graphs,
+                        "found": len(rows), "seconds": seconds,
+                        "graphs_per_s": graphs / seconds})
+        if verbose:
+            print(f"pregled n={n:3d}  {graphs} grafov, {graphs / seconds:9.1f} grafov/s")
+
+    return results
+
+
+def _git_revision():
+    folder = os.path.dirname(os.path.abspath(__file__))
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=folder,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def run_benchmarks(path=None, quick=False, processes=None, verbose=True):
+    """
+    Izvede vse meritve in vrne slovar z rezultati; če podamo path, ga
+    shrani tudi v JSON. Pri quick=True so grafi manjši (za hiter preizkus).
+    """
+
+    from jedro import _compiled_module
+
+    if quick:
+        sizes = dict(counting=(12, 16, 20), construction=(100, 1000),
+                     adj_construction=(1000, 10000), sa=(16,), scan=(14,))
+    else:
+        sizes = dict(counting=COUNTING_N, construction=CONSTRUCTION_N,
+                     adj_construction=ADJ_CONSTRUCTION_N, sa=SA_N, scan=SCAN_N)
+
+    results = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "revision": _git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "compiled_kernel": _compiled_module() is not None,
+            "quick": quick,
+        },
+        "import": import_benchmark(verbose=verbose),
+        "counting": counting_benchmark(sizes["counting"], verbose=verbose),
+        "construction": construction_benchmark(sizes["construction"],
+                                               sizes["adj_construction"], verbose=verbose),
+        "annealing": annealing_benchmark(sizes["sa"], verbose=verbose),
+        "scan": scan_benchmark(sizes["scan"], processes, verbose=verbose),
+    }
+
+    if path is not None:
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(results, f, indent=2)
+
+    return results
+
+
+# ključi, po katerih ujemamo vrstice, in izmerjena količina (večje = bolje?)
+_COMPARE = {
+    "import": (("module",), "seconds", False),
+    "counting": (("family", "n"), "seconds", False),
+    "construction": (("kind", "family", "n"), "seconds", False),
+    "annealing": (("n", "steps"), "steps_per_s", True),
+    "scan": (("n",), "graphs_per_s", True),
+}
+
+
+def compare_benchmarks(old_path, new_path, verbose=True):
+    """
+    Primerja dve datoteki z meritvami. Vrne seznam
+        (razdelek, ključ, stara vrednost, nova vrednost, pospešitev),
+    kjer je pospešitev > 1 izboljšava.
+    """
+
+    with open(old_path) as f:
+        old = json.load(f)
+    with open(new_path) as f:
+        new = json.load(f)
+
+    out = []
+    for section, (keys, field, higher_better) in _COMPARE.items():
+        before = {tuple(r[k] for k in keys): r.get(field) for r in old.get(section, [])}
+        for r in new.get(section, []):
+            key = tuple(r[k] for k in keys)
+            a, b = before.get(key), r.get(field)
+            if not a or not b:
+                continue
+            speedup = b / a if higher_better else a / b
+            out.append((section, key, a, b, speedup))
+            if verbose:
+                label = " ".join(str(k) for k in key)
+                print(f"{section:12s} {label:22s} {a:12.5g} -> {b:12.5g}  ×{speedup:.2f}")
+
+    return out
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Meritve hitrosti štetja poti, konstrukcij, SA in pregleda.")
+    parser.add_argument("--out", help="JSON datoteka za rezultate")
+    parser.add_argument("--quick", action="store_true", help="manjši grafi (hiter preizkus)")
+    parser.add_argument("--processes", type=int, default=None, help="procesi za pregled")
+    parser.add_argument("--compare", nargs=2, metavar=("STARO", "NOVO"),
+                        help="primerjaj dve JSON datoteki z meritvami")
+    parser.add_argument("--imports", action="store_true", help="le čas uvoza modulov")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare_benchmarks(*args.compare)
+    elif args.imports:
+        import_benchmark()
+    else:
+        run_benchmarks(args.out, quick=args.quick, processes=args.processes)
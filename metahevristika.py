@@ -1,5 +1,8 @@
 import random
-from funkcije2 import subpath_number
+import time
+from collections import deque
+from funkcije2 import subpath_number, subpath_number_delta
+from jedro import CubicGraph, SWAP_FAILURES, _apply_swap, _swap_delta, count_paths
 
 def random_cubic_neighbor(G, max_tries=500):
     """
@@ -10,6 +13,18 @@ def random_cubic_neighbor(G, max_tries=500):
     vrne kopijo G (brez spremembe).
     """
 
+    H, removed, added = random_cubic_swap(G, max_tries)
+    return H
+
+
+def random_cubic_swap(G, max_tries=500):
+    """
+    Kot random_cubic_neighbor, le da vrne tudi izvedeno zamenjavo:
+        H, removed, added
+    kjer sta removed in added seznama odstranjenih in dodanih robov
+    (oba prazna, če zamenjave ni bilo).
+    """
+
     # Preverimo veljavnost vhodnega grafa
     assert G.is_regular(3), "Graf ni kubičen (3-regularen)."
     assert G.is_connected(), "Graf ni povezan."
@@ -19,7 +34,7 @@ def random_cubic_neighbor(G, max_tries=500):
     edges = H.edges(labels=False)
     m = len(edges)
     if m < 2:
-        return H
+        return H, [], []
 
     for _ in range(max_tries):
 
@@ -27,12 +42,14 @@ def random_cubic_neighbor(G, max_tries=500):
         i = random.randrange(m)
         j = random.randrange(m)
         if i == j:
+            SWAP_FAILURES["same_edge"] += 1
             continue
         (u, v) = edges[i]
         (x, y) = edges[j]
 
         # potrebujemo 4 različna vozlišča (disjunktna roba)
         if len({u, v, x, y}) < 4:
+            SWAP_FAILURES["shared_vertex"] += 1
             continue
 
         # izberemo eno od dveh možnih zamenjav
@@ -49,6 +66,7 @@ def random_cubic_neighbor(G, max_tries=500):
 
         # brez paralelnih robov
         if H.has_edge(a, b) or H.has_edge(c, d):
+            SWAP_FAILURES["parallel_edge"] += 1
             continue
 
         # izvedemo zamenjavo
@@ -60,34 +78,109 @@ def random_cubic_neighbor(G, max_tries=500):
         # preverimo poveznost
         if H.is_connected() and H.is_regular(3):
             # Vse je ok, vrnemo nov graf
-            return H
+            return H, [(u, v), (x, y)], [(a, b), (c, d)]
         else:
             # razveljavi in poskusi z drugim switchom
+            SWAP_FAILURES["disconnected"] += 1
             H.delete_edge(a, b)
             H.delete_edge(c, d)
             H.add_edge(u, v)
             H.add_edge(x, y)
 
     # če ne uspe, vrnemo kopijo brez spremembe
-    return H
+    SWAP_FAILURES["exhausted"] += 1
+    return H, [], []
+
+
+def neighbor_with_energy(G, E, neighbor_fun=random_cubic_neighbor, max_tries=500, limit=None,
+                         cache=None, timings=None):
+    """
+    Vrne sosednji graf G_new in njegovo energijo subpath_number(G_new).
+
+    Pri privzeti sosednosti (random_cubic_neighbor) energijo izračunamo
+    inkrementalno s subpath_number_delta, sicer pa celotno štetje.
+    Če podamo limit, je energija natančna le, če je manjša od limit,
+    sicer je vrnjena vrednost kar limit (kot pri subpath_number).
+    Če podamo cache (PathCountCache), energijo najprej poiščemo v njem.
+
+    Če je G CubicGraph, zamenjavo naredimo na mestu in vrnemo kar G;
+    zavrnjeno potezo mora klicatelj razveljaviti z G.undo().
+
+    Če podamo slovar timings, mu k ključema "neighbor" in "evaluation"
+    prištejemo čas generiranja soseda in izračuna energije.
+    """
+
+    if timings is not None:
+        start = time.perf_counter()
+
+    if isinstance(G, CubicGraph):
+        removed, added = G.random_swap(max_tries)
+        G_new = G
+    elif neighbor_fun is random_cubic_neighbor:
+        G_new, removed, added = random_cubic_swap(G, max_tries)
+    else:
+        G_new = neighbor_fun(G, max_tries)
+
+    if timings is not None:
+        generated = time.perf_counter()
+        timings["neighbor"] += generated - start
+
+    if cache is not None:
+        key = cache.key(G_new.to_graph() if isinstance(G_new, CubicGraph) else G_new)
+        E_new = cache.get(key)
+        if E_new is not None:
+            if timings is not None:
+                timings["evaluation"] += time.perf_counter() - generated
+            return G_new, limit if limit is not None and E_new >= limit else E_new
+
+    if isinstance(G, CubicGraph):
+        E_new = E + _swap_delta(G.nbr, removed, added, None if limit is None else limit - E)
+    elif neighbor_fun is not random_cubic_neighbor:
+        E_new = subpath_number(G_new, limit=limit)
+    elif limit is None:
+        E_new = E + subpath_number_delta(G, removed, added)
+    else:
+        E_new = E + subpath_number_delta(G, removed, added, limit - E)
+
+    # v predpomnilnik shranimo le natančne vrednosti
+    if cache is not None and (limit is None or E_new < limit):
+        cache.put(key, E_new)
+
+    if timings is not None:
+        timings["evaluation"] += time.perf_counter() - generated
+
+    return G_new, E_new
 
 
 import math
 
-def estimate_positive_dE(Ln, neighbor_fun, samples=1000, max_tries=500):
+def estimate_positive_dE(Ln, neighbor_fun, samples=1000, max_tries=500, cache=None,
+                         return_walk=False):
     """
     Oceni povprečno pozitivno dE = subpath_number(G_new) - subpath_number(G)
     preko kratkega naključnega sprehoda po prostoru sosedov.
 
     Če ne najde nobene pozitivne dE, vrne 0.0.
+    Če podamo cache (PathCountCache), energije iščemo in shranjujemo v njem.
+
+    Pri return_walk=True vrne par (mean_dE, walk), kjer je
+        walk = (G, E, best_G, best_E, energies)
+    končno in najboljše stanje sprehoda ter energije po vseh korakih, da
+    lahko sprehod uporabimo kot začetek verige (sprehod je veriga pri
+    neskončni temperaturi).
     """
-    G = Ln.copy()
-    E = subpath_number(G)
+    E = subpath_number(Ln, cache=cache)
+    if neighbor_fun is random_cubic_neighbor:
+        G = CubicGraph.from_graph(Ln)
+    else:
+        G = Ln.copy()
+
+    best_G, best_E = G.copy(), E
+    energies = [E]
 
     dEs = []
     for _ in range(int(samples)):
-        G_new = neighbor_fun(G, max_tries)
-        E_new = subpath_number(G_new)
+        G_new, E_new = neighbor_with_energy(G, E, neighbor_fun, max_tries, cache=cache)
         dE = E_new - E
         if dE > 0:
             dEs.append(float(dE))
@@ -96,10 +189,46 @@ def estimate_positive_dE(Ln, neighbor_fun, samples=1000, max_tries=500):
         G = G_new
         E = E_new
 
-    if dEs:
-        return sum(dEs) / len(dEs)
+        if return_walk:
+            energies.append(E)
+            if E < best_E:
+                best_G, best_E = G.copy(), E
+
+    mean_dE = sum(dEs) / len(dEs) if dEs else 0.0
+
+    if return_walk:
+        return mean_dE, (G, E, best_G, best_E, energies)
+    return mean_dE
+
+
+def _auto_schedule(mean_dE, steps, T0, alpha, T_end_target, verbose=False):
+    """
+    Vrne začetno temperaturo in faktor ohlajanja (T, alpha), tako da je
+    tipična pozitivna dE na začetku sprejeta s p0 = 0.5, po steps korakih
+    pa je temperatura T_end_target. Če mean_dE <= 0, vrne podana T0, alpha.
+    """
+
+    #    Cilj: p0 ~ 0.4 na začetku, pend ~ 1e-4 na koncu
+    if mean_dE > 0:
+        p0   = 0.5     # želena začetna verjetnost sprejema tipične pozitivne dE
+        pend = 1e-7    # želena končna verjetnost sprejema tipične pozitivne dE
+
+        T0_auto   = -mean_dE / math.log(p0)
+        alpha_auto = (T_end_target / T0_auto)**(1.0 / steps)
+
+        T     = float(T0_auto)
+        alpha = float(alpha_auto)
+
+        if verbose:
+            print(f"[AUTO] mean_dE={mean_dE:.2f}, T0={T0_auto:.2f}, T_end={T_end_target:.2f}, alpha={alpha_auto:.6f}")
     else:
-        return 0.0
+        # fallback: uporabimo ročno podana T0 in alpha
+        T     = float(T0)
+        alpha = float(alpha)
+        if verbose:
+            print(f"[AUTO] mean_dE<=0, uporabljam podane parametre T0={T0}, alpha={alpha}")
+
+    return T, alpha
 
 
 def simulated_annealing_subpath(
@@ -110,7 +239,20 @@ def simulated_annealing_subpath(
     neighbor_fun=random_cubic_neighbor,
     max_tries=1000,
     T_end_target = 50.0,
-    verbose=False
+    verbose=False,
+    cache=None,
+    adaptive=False,
+    window=None,
+    accept_end=1e-3,
+    patience=None,
+    reheats=0,
+    reheat_frac=0.1,
+    frozen=0.05,
+    trace=None,
+    trace_every=1,
+    keep_history=True,
+    callback=None,
+    stats=None
 ):
     """
     Simulated annealing za minimizacijo subpath_number(G) na prostoru
@@ -120,6 +262,9 @@ def simulated_annealing_subpath(
         p = exp(-dE / T)  (Metropolis)
     z numerično stabilno zaščito pred overflowom.
 
+    Pri privzeti sosednosti veriga teče na CubicGraph (zamenjave na mestu
+    z razveljavljanjem), v Sage Graph pretvorimo le najboljši graf.
+
     Parametri:
         Ln         - začetni graf (povezan, 3-regularen)
         steps      - število korakov
@@ -127,9 +272,41 @@ def simulated_annealing_subpath(
         neighbor_fun - funkcija za generiranje soseda
         max_tries  - največ poskusov za iskanje veljavnega soseda
         verbose    - diagnostični izpis
+        cache      - predpomnilnik PathCountCache (neobvezno); izomorfnih
+                     grafov, ki jih veriga ponovno obišče, ne štejemo znova
+
+    Prilagodljiv način (adaptive=True):
+        - kalibracijski sprehod ni zavržen, ampak je začetek verige
+          (njegovi koraki štejejo v steps in so v history),
+        - vsakih window korakov (privzeto steps // 100) temperaturo popravimo
+          glede na delež sprejetih slabših korakov worse_accepted/worse_total:
+          ciljni delež pada geometrijsko od 0.5 do accept_end,
+        - če se best_E patience korakov (privzeto steps // 5) ne izboljša,
+          čeprav je veriga "zamrznjena" (delež sprejetih slabših korakov v
+          oknu je pod frozen), verigo vrnemo v najboljše stanje in jo
+          segrejemo na reheat_frac začetne temperature (največ
+          reheats-krat), sicer pa končamo predčasno.
+    patience lahko podamo tudi brez adaptive (le zaustavitev/segrevanje).
+
+    Spremljanje dolgih zagonov:
+        trace        - pot do datoteke, kamor sproti pišemo zapise
+                       (step, T, E, best_E); glej EnergyTrace. Zapisani so
+                       isti koraki kot v history, pri adaptive=True torej
+                       tudi kalibracijski sprehod (s T = inf)
+        trace_every  - zapišemo (in v history hranimo) le vsak trace_every-ti korak
+        keep_history - če je False, history ostane prazen
+        callback     - funkcija callback(step, T, E, best_E), ki jo kličemo
+                       po vsakem koraku; če vrne True, zagon končamo
+        stats        - slovar, ki ga na koncu napolnimo s števci (steps,
+                       accepted, worse_total, worse_accepted), neuspelimi
+                       poskusi zamenjav po razlogih (swap_failures, glej
+                       jedro.SWAP_FAILURES), časi faz (timings: neighbor,
+                       evaluation, acceptance), seconds in steps_per_s;
+                       časi faz se merijo le, če stats podamo
 
     Vrne:
         best_G, best_E, history
+    (history je pri predčasni zaustavitvi krajši od steps + 1)
     """
 
     assert Ln.is_regular(3)
@@ -142,94 +319,811 @@ def simulated_annealing_subpath(
     # 1) Ocena povprečne pozitivne dE
     # vzorčimo največ 'steps' ali 1000, kar je manj
     sample_count = min(200, steps)
-    mean_dE = estimate_positive_dE(Ln, neighbor_fun, samples=sample_count, max_tries=max_tries)
-
-    # 2) Samodejna nastavitev T0 in alpha iz mean_dE in steps
-    #    Cilj: p0 ~ 0.4 na začetku, pend ~ 1e-4 na koncu
-    if mean_dE > 0:
-        p0   = 0.5     # želena začetna verjetnost sprejema tipične pozitivne dE
-        pend = 1e-7    # želena končna verjetnost sprejema tipične pozitivne dE
+    fast = neighbor_fun is random_cubic_neighbor
 
-        T0_auto   = -mean_dE / math.log(p0)
-        alpha_auto = (T_end_target / T0_auto)**(1.0 / steps)
-
-        T     = float(T0_auto)
-        alpha = float(alpha_auto)
-
-        if verbose:
-            print(f"[AUTO] mean_dE={mean_dE:.2f}, T0={T0_auto:.2f}, T_end={T_end_target:.2f}, alpha={alpha_auto:.6f}")
+    if adaptive:
+        # kalibracijski sprehod je hkrati prvih sample_count korakov verige
+        mean_dE, walk = estimate_positive_dE(Ln, neighbor_fun, samples=sample_count,
+                                             max_tries=max_tries, cache=cache,
+                                             return_walk=True)
+        G, E, best_G, best_E, history = walk
+        first_step = sample_count + 1
     else:
-        # fallback: uporabimo ročno podana T0 in alpha
-        T     = float(T0)
-        alpha = float(alpha)
-        if verbose:
-            print(f"[AUTO] mean_dE<=0, uporabljam podane parametre T0={T0}, alpha={alpha}")
+        mean_dE = estimate_positive_dE(Ln, neighbor_fun, samples=sample_count,
+                                       max_tries=max_tries, cache=cache)
+        first_step = 1
+
+    # 2) Samodejna nastavitev T0 in alpha iz mean_dE in preostalih korakov
+    T, alpha = _auto_schedule(mean_dE, max(1, steps - first_step + 1), T0, alpha,
+                              T_end_target, verbose)
+    T_start = T
 
     # 3) Začetno stanje
-    G = Ln.copy()
-    E = subpath_number(G)
+    if not adaptive:
+        E = subpath_number(Ln, cache=cache)
+        G = CubicGraph.from_graph(Ln) if fast else Ln.copy()
 
-    best_G = G.copy()
-    best_E = E
+        best_G = G.copy()
+        best_E = E
 
-    history = [E]
+        history = [E]
 
-    worse_total = 0
-    worse_accepted = 0
+    # spremljanje: redčenje history, zapis v datoteko, števci in časi faz
+    trace_every = max(1, int(trace_every))
+    start_energies = history  # koraki 0..first_step - 1
+    if not keep_history:
+        history = []
+    elif trace_every > 1:
+        history = history[::trace_every]
+    writer = EnergyTrace(trace) if trace is not None else None
+    try:
+        if writer is not None:
+            # zapišemo iste korake kot v history; kalibracijski sprehod
+            # sprejme vsako potezo, zato ima T = inf
+            walk_best = start_energies[0]
+            for step, E_walk in enumerate(start_energies):
+                walk_best = min(walk_best, E_walk)
+                if step % trace_every == 0:
+                    writer.write(step, T if step == first_step - 1 else math.inf,
+                                 E_walk, walk_best)
 
-    for step in range(1, steps+1):
+        timings = dict.fromkeys(("neighbor", "evaluation", "acceptance"), 0.0) \
+            if stats is not None else None
+        failures_before = dict(SWAP_FAILURES)
+        started = time.perf_counter()
+        step = first_step - 1
+        accepted_all = worse_all = worse_accepted_all = 0
 
-        # generiraj sosednji kubični graf
-        G_new = neighbor_fun(G, max_tries)
-        E_new = subpath_number(G_new)
-        dE = E_new - E
+        worse_total = 0
+        worse_accepted = 0
 
-        if dE <= 0:
-            # izboljšava → vedno sprejmi
-            accept = True
-        else:
-            worse_total += 1
+        # prilagajanje temperature in zaznavanje zastoja
+        if window is None:
+            window = max(1, steps // 100)
+        if patience is None and adaptive:
+            patience = max(1, steps // 5)
+        window_total = 0
+        window_accepted = 0
+        last_improvement = first_step - 1
+
+        for step in range(first_step, steps+1):
 
             # Metropolis sprejemna verjetnost p = exp(-dE/T)
-            x = dE / T
+            # Pogoj r < p za naključen r iz (0, 1] je enak dE < -T*ln(r), zato mejo
+            # izračunamo vnaprej in jo podamo štetju kot limit: štetje soseda, ki
+            # bo zagotovo zavrnjen, se tako predčasno ustavi.
+            r = 1.0 - random.random()
+            limit = math.ceil(E - T * math.log(r))
+
+            # generiraj sosednji kubični graf
+            G_new, E_new = neighbor_with_energy(G, E, neighbor_fun, max_tries, limit, cache,
+                                                timings)
+            if timings is not None:
+                accept_start = time.perf_counter()
+            dE = E_new - E
 
-            # numerična zaščita pred overflowom
-            if x >= 700:       # exp(-700) ≈ 5e-305 (meja double)
-                p = 0.0
+            if dE <= 0:
+                # izboljšava → vedno sprejmi
+                accept = True
             else:
-                p = math.exp(-x)
+                worse_total += 1
+                window_total += 1
+                worse_all += 1
 
-            accept = (random.random() < p)
+                # E_new >= limit pomeni zavrnitev (E_new tedaj ni natančen)
+                accept = (E_new < limit)
+
+                if accept:
+                    worse_accepted += 1
+                    window_accepted += 1
+                    worse_accepted_all += 1
+                    
 
             if accept:
-                worse_accepted += 1
+                G = G_new
+                E = E_new
+                accepted_all += 1
                 
 
-        if accept:
-            G = G_new
-            E = E_new
-            
+                if E < best_E:
+                    best_E = E
+                    best_G = G.copy()
+                    last_improvement = step
+            elif fast:
+                G.undo()
+
+            if timings is not None:
+                timings["acceptance"] += time.perf_counter() - accept_start
+
+            # ohlajanje
+            T *= alpha
+            if step % trace_every == 0:
+                if keep_history:
+                    history.append(E)
+                if writer is not None:
+                    writer.write(step, T, E, best_E)
+
+            if callback is not None and callback(step, T, E, best_E):
+                break
+
+            if step % window == 0:
+                if adaptive:
+                    # ciljni delež sprejetih slabših korakov v tem delu verige
+                    target = 0.5 * (accept_end / 0.5) ** (step / steps)
+                    # glajena ocena (pri malo podatkih ostane blizu cilja)
+                    ratio = (window_accepted + 0.5) / (window_total + 0.5 / target)
+                    T *= min(2.0, max(0.5, target / ratio)) ** 0.5
+
+                # dokler veriga še sprejema veliko slabših korakov, ne zastaja
+                if window_total and window_accepted / window_total >= frozen:
+                    last_improvement = step
+
+                window_total = 0
+                window_accepted = 0
+
+            if patience and step - last_improvement >= patience:
+                if reheats > 0:
+                    reheats -= 1
+                    G = best_G.copy()
+                    E = best_E
+                    T = max(T, reheat_frac * T_start)
+                    last_improvement = step
+                    if verbose:
+                        print(f"Korak {int(step)}: zastoj, segrevanje na T={float(T):.4f}")
+                else:
+                    if verbose:
+                        print(f"Korak {int(step)}: zastoj {int(patience)} korakov, končujem")
+                    break
+
+            # diagnostični izpis (10× v teku)
+            if verbose and step % max(1, steps // 10) == 0:
+                ratio = 100.0 * worse_accepted / worse_total if worse_total else 0.0
+                print(
+                    f"Korak {int(step)}, "
+                    f"T={float(T):.4f}, "
+                    f"E={int(E)}, best_E={int(best_E)}, "
+                    f"sprejetih slabših = {int(worse_accepted)}/{int(worse_total)} "
+                    f"({ratio:.2f} %)"
+                )
+                # reset lokalne statistike za naslednji interval
+                worse_total = 0
+                worse_accepted = 0
+    finally:
+        # zapise zapišemo tudi ob prekinitvi (npr. KeyboardInterrupt)
+        if writer is not None:
+            writer.close()
+
+    if stats is not None:
+        seconds = time.perf_counter() - started
+        done = step - first_step + 1
+        stats.update({
+            "steps": done,
+            "accepted": accepted_all,
+            "worse_total": worse_all,
+            "worse_accepted": worse_accepted_all,
+            "swap_failures": {k: SWAP_FAILURES[k] - failures_before[k] for k in SWAP_FAILURES},
+            "timings": timings,
+            "seconds": seconds,
+            "steps_per_s": done / seconds if seconds > 0 else 0.0,
+        })
 
+    if verbose and cache is not None:
+        st = cache.stats()
+        print(
+            f"Predpomnilnik: zadetkov {st['memory_hits'] + st['disk_hits']} "
+            f"(pomnilnik {st['memory_hits']}, disk {st['disk_hits']}), "
+            f"zgrešenih {st['misses']} ({100.0 * st['hit_rate']:.2f} %)"
+        )
+
+    if fast:
+        best_G = best_G.to_graph()
+
+    return best_G, best_E, history
+
+
+import json
+import struct
+
+class EnergyTrace:
+    """
+    Sprotni zapis poteka verige v datoteko, zapis za zapisom
+        (step, T, E, best_E).
+
+    Če se pot konča z .jsonl, je vsak zapis ena vrstica JSON, sicer pa
+    pišemo kompaktne binarne zapise (struct "<qdqq", 32 bajtov; E in
+    best_E morata biti manjša od 2^63). Zapise preberemo z EnergyTrace.read.
+
+    Primer:
+        simulated_annealing_subpath(G, steps=10**6, trace="Data/sa.trace",
+                                    trace_every=100, keep_history=False)
+        for step, T, E, best_E in EnergyTrace.read("Data/sa.trace"): ...
+    """
+
+    RECORD = struct.Struct("<qdqq")
+
+    def __init__(self, path):
+        self.path = path
+        self.binary = not str(path).endswith(".jsonl")
+        self._file = open(path, "wb" if self.binary else "w")
+
+    def write(self, step, T, E, best_E):
+        if self.binary:
+            self._file.write(self.RECORD.pack(step, T, E, best_E))
+        else:
+            self._file.write(json.dumps({"step": step, "T": T, "E": E, "best_E": best_E}) + "\n")
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @classmethod
+    def read(cls, path):
+        """Generator zapisov (step, T, E, best_E) iz datoteke."""
+
+        if str(path).endswith(".jsonl"):
+            with open(path) as f:
+                for line in f:
+                    r = json.loads(line)
+                    yield r["step"], r["T"], r["E"], r["best_E"]
+        else:
+            with open(path, "rb") as f:
+                while True:
+                    chunk = f.read(cls.RECORD.size * 4096)
+                    if not chunk:
+                        break
+                    yield from cls.RECORD.iter_unpack(chunk)
+
+import os
+from multiprocessing import Pool
+
+def rejection_free_annealing_subpath(
+    Ln,
+    steps=2000,
+    batch_size=32,
+    T0=1000,
+    alpha=0.9995,
+    max_tries=1000,
+    T_end_target=50.0,
+    cutoff=30.0,
+    processes=None,
+    verbose=False
+):
+    """
+    Simulated annealing brez zavrnjenih korakov (n-fold way) za
+    minimizacijo subpath_number(G) na prostoru povezanih kubičnih grafov.
+
+    V vsakem koraku naključno izberemo batch_size kandidatnih double-edge
+    swap zamenjav, vsem izračunamo dE (inkrementalno) in eno izberemo z
+    verjetnostjo, sorazmerno njeni Metropolisovi uteži
+        w = min(1, exp(-dE / T)).
+    Tako se stanje spremeni v (skoraj) vsakem koraku, tudi pri nizki
+    temperaturi, kjer navadna veriga večino korakov zavrne.
+
+    Kandidatov z dE >= cutoff * T (utež pod exp(-cutoff)) ne štejemo do
+    konca, ampak jim damo utež 0. Če so vsi kandidati taki, stanje ostane.
+
+    Parametri:
+        Ln           - začetni graf (povezan, 3-regularen)
+        steps        - število korakov (vsak oceni batch_size kandidatov)
+        batch_size   - število kandidatov na korak
+        T0, alpha    - uporabljena le, če auto-kalibracija ne uspe
+        max_tries    - največ poskusov za iskanje veljavne zamenjave
+        T_end_target - končna temperatura urnika
+        cutoff       - meja dE / T, nad katero je utež kandidata 0
+        processes    - če je podan, kandidate ocenjujemo v toliko procesih
+                       (splača se le pri večjih grafih)
+        verbose      - diagnostični izpis
+
+    Vrne:
+        best_G, best_E, history, stats
+    kjer je stats slovar s številom sprejetih potez, ocenjenih kandidatov,
+    časom in hitrostma (accepted_per_s, evaluations_per_s).
+    """
+
+    assert Ln.is_regular(3)
+    assert Ln.is_connected()
+
+    steps      = int(steps)
+    batch_size = int(batch_size)
+    max_tries  = int(max_tries)
+
+    # enak urnik kot pri simulated_annealing_subpath; korakov je tu manj,
+    # zato ga nastavimo glede na steps
+    mean_dE = estimate_positive_dE(Ln, random_cubic_neighbor, samples=min(200, steps),
+                                   max_tries=max_tries)
+    T, alpha = _auto_schedule(mean_dE, steps, T0, alpha, T_end_target, verbose)
+
+    E = subpath_number(Ln)
+    G = CubicGraph.from_graph(Ln)
+
+    best_G = G.copy()
+    best_E = E
+    history = [E]
+
+    accepted = 0
+    evaluations = 0
+    pool = Pool(processes) if processes else None
+    start = time.time()
+
+    try:
+        for step in range(1, steps + 1):
+
+            # kandidatne zamenjave (vsako takoj razveljavimo)
+            moves = []
+            for _ in range(batch_size):
+                removed, added = G.random_swap(max_tries)
+                if removed:
+                    moves.append(G.last_move())
+                    G.undo()
+
+            # ocenimo kandidate; dE >= cap pomeni utež 0
+            cap = max(1, math.ceil(cutoff * T))
+            if pool is None:
+                dEs = _score_swaps((G.nbr, moves, cap))
+            else:
+                chunk = -(-len(moves) // processes)
+                tasks = [(G.nbr, moves[i:i + chunk], cap)
+                         for i in range(0, len(moves), chunk)]
+                dEs = [dE for part in pool.map(_score_swaps, tasks) for dE in part]
+            evaluations += len(moves)
+
+            weights = [0.0 if dE >= cap else 1.0 if dE <= 0 else math.exp(-dE / T)
+                       for dE in dEs]
+
+            if moves and sum(weights) > 0:
+                i = random.choices(range(len(moves)), weights=weights)[0]
+                G.apply_swap(moves[i])
+                E += dEs[i]
+                accepted += 1
+
+                if E < best_E:
+                    best_E = E
+                    best_G = G.copy()
+
+            # ohlajanje
+            T *= alpha
+            history.append(E)
+
+            if verbose and step % max(1, steps // 10) == 0:
+                elapsed = time.time() - start
+                print(
+                    f"Korak {int(step)}, "
+                    f"T={float(T):.4f}, "
+                    f"E={int(E)}, best_E={int(best_E)}, "
+                    f"sprejetih/s = {accepted / elapsed if elapsed > 0 else 0.0:.1f}"
+                )
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    seconds = time.time() - start
+    stats = {
+        "accepted": accepted,
+        "evaluations": evaluations,
+        "seconds": seconds,
+        "accepted_per_s": accepted / seconds if seconds > 0 else 0.0,
+        "evaluations_per_s": evaluations / seconds if seconds > 0 else 0.0,
+    }
+
+    if verbose:
+        print(
+            f"Sprejetih potez: {accepted} ({stats['accepted_per_s']:.1f}/s), "
+            f"ocenjenih kandidatov: {evaluations} ({stats['evaluations_per_s']:.1f}/s)"
+        )
+
+    return best_G.to_graph(), best_E, history, stats
+
+
+def _score_swaps(task):
+    """
+    Vrne seznam dE za zamenjave moves (zapisi (i, j, removed, added) iz
+    CubicGraph.random_swap) na grafu s seznamom sosedov nbr; dE >= cap
+    nadomesti s cap. Teče lahko tudi v delovnem procesu.
+    """
+
+    nbr, moves, cap = task
+    adj = [list(a) for a in nbr]
+
+    dEs = []
+    for _, _, removed, added in moves:
+        _apply_swap(adj, removed, added)
+        dEs.append(_swap_delta(adj, removed, added, cap))
+        _apply_swap(adj, added, removed)
+    return dEs
+
+
+def parallel_tempering_subpath(
+    Ln,
+    rounds=200,
+    steps_per_round=100,
+    replicas=8,
+    temperatures=None,
+    T_min=50.0,
+    neighbor_fun=random_cubic_neighbor,
+    max_tries=1000,
+    processes=None,
+    verbose=False
+):
+    """
+    Parallel tempering (replica exchange) za minimizacijo subpath_number(G)
+    na prostoru povezanih kubičnih grafov.
+
+    Replike tečejo pri lestvici temperatur T_0 < T_1 < ... v ločenih
+    procesih. V vsakem krogu vsaka replika naredi steps_per_round korakov
+    Metropolisa pri svoji (stalni) temperaturi, nato pa poskusimo zamenjati
+    stanji sosednjih temperatur i, i+1 (izmenično sode in lihe pare)
+    z verjetnostjo
+        p = min(1, exp((1/T_i - 1/T_{i+1}) * (E_i - E_{i+1}))).
+
+    Parametri:
+        Ln              - začetni graf (povezan, 3-regularen)
+        rounds          - število krogov (izmenjav)
+        steps_per_round - število korakov vsake replike v enem krogu
+        replicas        - število replik (uporabi se, če temperatures ni podan)
+        temperatures    - lestvica temperatur; privzeto geometrijska od T_min
+                          do T_max, kjer T_max dobimo iz estimate_positive_dE
+                          tako, da je tipičen slabši korak sprejet s p = 0.5
+        neighbor_fun    - funkcija za generiranje soseda (mora biti na nivoju
+                          modula, da jo lahko pošljemo v procese)
+        max_tries       - največ poskusov za iskanje veljavnega soseda
+        processes       - število procesov (privzeto min(replik, jeder))
+        verbose         - diagnostični izpis
+
+    Vrne:
+        best_G, best_E, histories
+    kjer je histories seznam slovarjev (en na repliko) z energijami replike
+    po vseh korakih ("E") in indeksom temperature v vsakem krogu ("T").
+    """
+
+    assert Ln.is_regular(3)
+    assert Ln.is_connected()
+
+    rounds          = int(rounds)
+    steps_per_round = int(steps_per_round)
+    max_tries       = int(max_tries)
+
+    # 1) Lestvica temperatur
+    if temperatures is None:
+        replicas = int(replicas)
+        mean_dE = estimate_positive_dE(Ln, neighbor_fun, samples=200, max_tries=max_tries)
+        T_max = -mean_dE / math.log(0.5) if mean_dE > 0 else 1000.0
+        T_max = max(T_max, T_min)
+        if replicas == 1:
+            temperatures = [float(T_min)]
+        else:
+            ratio = (T_max / T_min) ** (1.0 / (replicas - 1))
+            temperatures = [float(T_min * ratio**i) for i in range(replicas)]
+    temperatures = sorted(float(T) for T in temperatures)
+    K = len(temperatures)
+
+    if verbose:
+        print("[PT] temperature: " + ", ".join(f"{T:.1f}" for T in temperatures))
+
+    # 2) Začetna stanja: na vsaki temperaturi replika z grafom Ln
+    E0 = subpath_number(Ln)
+    states = [(Ln.graph6_string(), E0) for _ in range(K)]
+    owner = list(range(K))  # owner[k] ... replika, ki je trenutno pri temperaturi k
+
+    best_G6 = Ln.graph6_string()
+    best_E = E0
+    histories = [{"E": [E0], "T": []} for _ in range(K)]
+
+    swaps_tried = [0] * (K - 1)
+    swaps_done = [0] * (K - 1)
+
+    if processes is None:
+        processes = min(K, os.cpu_count() or 1)
+
+    with Pool(processes) as pool:
+        for rnd in range(rounds):
+
+            # 3) Vse replike naredijo svoje korake vzporedno
+            tasks = [
+                (states[k][0], states[k][1], temperatures[k], steps_per_round,
+                 neighbor_fun, max_tries, random.randrange(2**32))
+                for k in range(K)
+            ]
+            results = pool.map(_tempering_chain, tasks)
+
+            for k, (G6, E, chain_best_G6, chain_best_E, history) in enumerate(results):
+                states[k] = (G6, E)
+                histories[owner[k]]["E"].extend(history)
+                histories[owner[k]]["T"].append(k)
+                if chain_best_E < best_E:
+                    best_E = chain_best_E
+                    best_G6 = chain_best_G6
+
+            # 4) Izmenjave med sosednjimi temperaturami (sodi/lihi pari)
+            for k in range(rnd % 2, K - 1, 2):
+                swaps_tried[k] += 1
+                x = (1.0 / temperatures[k] - 1.0 / temperatures[k + 1]) * (states[k][1] - states[k + 1][1])
+                if x >= 0 or random.random() < math.exp(x):
+                    states[k], states[k + 1] = states[k + 1], states[k]
+                    owner[k], owner[k + 1] = owner[k + 1], owner[k]
+                    swaps_done[k] += 1
+
+            # diagnostični izpis (10× v teku)
+            if verbose and (rnd + 1) % max(1, rounds // 10) == 0:
+                rates = ", ".join(
+                    f"{100.0 * d / t:.0f}%" if t else "-"
+                    for d, t in zip(swaps_done, swaps_tried)
+                )
+                print(
+                    f"Krog {rnd + 1}, best_E={int(best_E)}, "
+                    f"E=[{', '.join(str(int(E)) for G6, E in states)}], "
+                    f"izmenjave: {rates}"
+                )
+
+    from sage.all import Graph
+    return Graph(best_G6), best_E, histories
+
+
+def _tempering_chain(task):
+    """
+    Naredi steps korakov Metropolisa pri stalni temperaturi T;
+    teče v delovnem procesu (glej parallel_tempering_subpath).
+    """
+
+    G6, E, T, steps, neighbor_fun, max_tries, seed = task
+    random.seed(seed)
+
+    # pri privzeti sosednosti delovni proces ne potrebuje Sage
+    if neighbor_fun is random_cubic_neighbor:
+        fast = True
+        G = CubicGraph.from_graph6(G6)
+    else:
+        from sage.all import Graph
+        fast = False
+        G = Graph(G6)
+    best_G6, best_E = G6, E
+    history = []
+
+    for _ in range(steps):
+        # enako kot v simulated_annealing_subpath: meja za sprejem vnaprej
+        r = 1.0 - random.random()
+        limit = math.ceil(E - T * math.log(r))
+
+        G_new, E_new = neighbor_with_energy(G, E, neighbor_fun, max_tries, limit)
+        if E_new < limit:
+            G, E = G_new, E_new
             if E < best_E:
                 best_E = E
-                best_G = G.copy()
-
-        # ohlajanje
-        T *= alpha
+                best_G6 = G.graph6_string()
+        elif fast:
+            G.undo()
         history.append(E)
 
-        # diagnostični izpis (10× v teku)
-        if verbose and step % max(1, steps // 10) == 0:
-            ratio = 100.0 * worse_accepted / worse_total if worse_total else 0.0
-            print(
-                f"Korak {int(step)}, "
-                f"T={float(T):.4f}, "
-                f"E={int(E)}, best_E={int(best_E)}, "
-                f"sprejetih slabših = {int(worse_accepted)}/{int(worse_total)} "
-                f"({ratio:.2f} %)"
-            )
-            # reset lokalne statistike za naslednji interval
-            worse_total = 0
-            worse_accepted = 0
-
-    return best_G, best_E, history
\ No newline at end of file
+    return G.graph6_string(), E, best_G6, best_E, history
+
+
+def tabu_search_subpath(
+    Ln,
+    iterations=200,
+    tenure=None,
+    patience=None,
+    restarts=0,
+    kick=None,
+    target=None,
+    processes=None,
+    seed=None,
+    verbose=False
+):
+    """
+    Tabu iskanje (oz. najstrmejši spust pri tenure=0) za minimizacijo
+    subpath_number(G) na prostoru povezanih kubičnih grafov.
+
+    V vsaki iteraciji naštejemo vse veljavne double-edge swap zamenjave
+    trenutnega grafa (CubicGraph.swaps) in izvedemo najboljšo dovoljeno,
+    tudi če je slabša od trenutnega stanja. Tabu sta
+      - robova, ki ju zamenjava odstrani: zamenjava, ki bi ju vrnila, je
+        naslednjih tenure iteracij dovoljena le, če da novo najboljšo
+        vrednost (aspiracija),
+      - energije zadnjih tenure obiskanih stanj (vključno s trenutnim):
+        enaka vrednost pn skoraj vedno pomeni izomorfen graf, zato se tako
+        ne vrtimo po platoju zamenjav z dE = 0.
+
+    Zamenjave ocenjujemo inkrementalno (_swap_delta) in omejeno: ko
+    poznamo najboljši dE v skupini, štetje za ostale ustavimo, čim dE
+    doseže to mejo. Skupine lahko ocenjujemo v processes procesih.
+
+    Če se best_E patience iteracij ne izboljša (pri tenure=0: v lokalnem
+    minimumu), iskanje nadaljujemo iz najboljšega grafa, ki ga premešamo s
+    kick naključnimi zamenjavami (največ restarts-krat), sicer končamo.
+
+    Parametri:
+        Ln         - začetni graf (povezan, 3-regularen)
+        iterations - največje število iteracij (izvedenih zamenjav)
+        tenure     - dolžina tabu seznama (v iteracijah); privzeto n,
+                     pri 0 je to najstrmejši spust, ki se ustavi v
+                     lokalnem minimumu
+        patience   - ponoven začetek oz. konec, če se best_E toliko
+                     iteracij ne izboljša
+        restarts   - največje število ponovnih začetkov
+        kick       - število naključnih zamenjav pri ponovnem začetku;
+                     privzeto n // 4
+        target     - končamo, ko best_E doseže target (npr. znano najboljšo
+                     vrednost iz Data/SA_results.csv)
+        processes  - če je podan, zamenjave ocenjujemo v toliko procesih
+        seed       - seme za naključni vrstni red zamenjav in premešanje
+                     pri ponovnih začetkih (enako seme da enak izid)
+        verbose    - diagnostični izpis
+
+    Vrne:
+        best_G, best_E, history, stats
+    kjer je stats slovar s številom iteracij, ocenjenih zamenjav
+    (evaluations), ponovnih začetkov, iteracijo, v kateri je bil najden
+    best_E (best_iteration), in časom.
+    """
+
+    assert Ln.is_regular(3)
+    assert Ln.is_connected()
+
+    rng = random.Random(seed)
+    G = CubicGraph.from_graph(Ln)
+    E = subpath_number(Ln)
+    if tenure is None:
+        tenure = G.n
+    if kick is None:
+        kick = max(1, G.n // 4)
+
+    best_G = G.copy()
+    best_E = E
+    best_iteration = 0
+    last_improvement = 0
+    restarted = 0
+    done = 0
+    history = [E]
+
+    tabu = {}  # rob (u, v), u < v -> iteracija, do katere je tabu
+    recent = deque([E], maxlen=max(1, tenure))  # energije zadnjih stanj
+    evaluations = 0
+    pool = Pool(processes) if processes else None
+    start = time.time()
+
+    try:
+        for it in range(1, iterations + 1):
+            done = it
+
+            moves = G.swaps()
+            rng.shuffle(moves)
+            flags = [any(tabu.get((min(e), max(e)), 0) >= it for e in move[3])
+                     for move in moves]
+
+            # tabu zamenjava je dovoljena le, če izboljša best_E
+            aspiration = best_E - E
+            forbidden = {e - E for e in recent}
+            if pool is None:
+                results = [_best_swap((G.nbr, moves, flags, aspiration, forbidden))]
+            else:
+                chunk = -(-len(moves) // processes)
+                tasks = [(G.nbr, moves[i:i + chunk], flags[i:i + chunk], aspiration, forbidden)
+                         for i in range(0, len(moves), chunk)]
+                results = []
+                for offset, (dE, k) in zip(range(0, len(moves), chunk),
+                                           pool.map(_best_swap, tasks)):
+                    results.append((dE, None if k is None else k + offset))
+            evaluations += len(moves)
+
+            results = [r for r in results if r[1] is not None]
+            dE, k = min(results) if results else (None, None)
+
+            # vse zamenjave so tabu oz. (pri tenure=0) smo v lokalnem minimumu
+            stuck = k is None or (tenure == 0 and dE >= 0)
+            if not stuck:
+                move = moves[k]
+                G.apply_swap(move)
+                E += dE
+                recent.append(E)
+                for u, v in move[2]:
+                    tabu[(min(u, v), max(u, v))] = it + tenure
+                history.append(E)
+
+                if E < best_E:
+                    best_E = E
+                    best_G = G.copy()
+                    best_iteration = last_improvement = it
+
+                if verbose:
+                    print(f"Iteracija {it}: E={int(E)}, best_E={int(best_E)}, "
+                          f"zamenjav={len(moves)}, dE={int(dE)}")
+
+                if target is not None and best_E <= target:
+                    break
+
+            if stuck or (patience is not None and it - last_improvement >= patience):
+                if restarted >= restarts:
+                    break
+                restarted += 1
+
+                # premešamo najboljši graf in začnemo znova
+                G = best_G.copy()
+                for _ in range(kick):
+                    G.random_swap(rng=rng)
+                E = count_paths(G.nbr)
+                tabu.clear()
+                recent.clear()
+                recent.append(E)
+                last_improvement = it
+                history.append(E)
+
+                if verbose:
+                    print(f"Ponoven začetek {restarted}: E={int(E)}, best_E={int(best_E)}")
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    seconds = time.time() - start
+    stats = {
+        "iterations": done,
+        "evaluations": evaluations,
+        "restarts": restarted,
+        "best_iteration": best_iteration,
+        "seconds": seconds,
+        "evaluations_per_s": evaluations / seconds if seconds > 0 else 0.0,
+    }
+
+    if verbose:
+        print(f"Ocenjenih zamenjav: {evaluations} ({stats['evaluations_per_s']:.1f}/s), "
+              f"best_E={int(best_E)} v iteraciji {best_iteration}")
+
+    return best_G.to_graph(), best_E, history, stats
+
+
+def verify_tabu_seed(n=20, seed=1, iterations=40):
+    """
+    Preveri, da dva zagona tabu_search_subpath na Ln_graph(n) z enakim
+    semenom (s ponovnimi začetki, da se izvede tudi premešanje) vrneta
+    enak najboljši graf, zgodovino energij in statistiko. Vrne True ali
+    False.
+    """
+
+    from funkcije2 import Ln_graph
+
+    runs = []
+    for _ in range(2):
+        best_G, best_E, history, stats = tabu_search_subpath(
+            Ln_graph(n), iterations=iterations, patience=3, restarts=5, seed=seed
+        )
+        stats.pop("seconds")
+        stats.pop("evaluations_per_s")
+        runs.append((best_G.graph6_string(), best_E, history, stats))
+
+    return runs[0] == runs[1]
+
+
+def _best_swap(task):
+    """
+    Vrne (dE, k) za najboljšo dovoljeno zamenjavo moves[k] na grafu s
+    seznamom sosedov nbr oz. (None, None), če dovoljene ni. Zamenjava s
+    flags[k] (tabu) ali z dE v forbidden je dovoljena le pri
+    dE < aspiration. Vsako zamenjavo štejemo le do meje, ki jo mora
+    preseči (najboljši dE doslej), zato je večina ocen omejenih. Teče
+    lahko tudi v delovnem procesu.
+    """
+
+    nbr, moves, flags, aspiration, forbidden = task
+    adj = [list(a) for a in nbr]
+
+    best, best_k = None, None
+    for k, (_, _, removed, added) in enumerate(moves):
+        if flags[k]:
+            limit = aspiration if best is None else min(aspiration, best)
+        else:
+            limit = best
+
+        _apply_swap(adj, removed, added)
+        dE = _swap_delta(adj, removed, added, limit)
+        _apply_swap(adj, added, removed)
+
+        if limit is None or dE < limit:
+            if dE in forbidden and not dE < aspiration:
+                continue
+            best, best_k = dE, k
+    return best, best_k
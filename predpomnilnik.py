@@ -0,0 +1,159 @@
+import os
+import sqlite3
+from collections import OrderedDict
+
+
+def canonical_graph6(G):
+    """
+    Vrne kanonični graph6 zapis grafa G; izomorfna grafa imata enak zapis.
+
+    G je lahko Sage Graph ali graph6 niz (npr. prebran iz CSV).
+    """
+
+    if isinstance(G, str):
+        from sage.all import Graph
+        G = Graph(G)
+
+    return G.canonical_label().graph6_string()
+
+
+class SQLiteStore:
+    """
+    Osnova za razrede, ki podatke hranijo v SQLite bazi `path` (lahko
+    None), ki jo hkrati uporablja več procesov.
+
+    Vsak proces odpre svojo povezavo (WAL, tabele iz `_schema`), pri
+    pošiljanju v delovne procese pa povezave ne kopiramo.
+    """
+
+    _schema = ""
+
+    def __init__(self, path=None):
+        self.path = path
+        self._conn = None
+        self._pid = None  # povezave SQLite ne smemo deliti med procesi
+
+    def _connection(self):
+        """Vrne povezavo na bazo (za vsak proces svojo) ali None."""
+
+        if self.path is None:
+            return None
+
+        if self._conn is None or self._pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=60)
+            # WAL dovoli hkratno branje in pisanje iz več procesov
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(self._schema)
+            conn.commit()
+            self._conn = conn
+            self._pid = os.getpid()
+
+        return self._conn
+
+    def __getstate__(self):
+        # v delovne procese pošljemo le nastavitve, ne povezave
+        state = self.__dict__.copy()
+        state["_conn"] = None
+        state["_pid"] = None
+        return state
+
+
+class SQLiteCache(SQLiteStore):
+    """
+    SQLiteStore z omejenim LRU slovarjem v pomnilniku (največ `maxsize`
+    vnosov) pred bazo.
+    """
+
+    def __init__(self, path=None, maxsize=100000):
+        super().__init__(path)
+        self.maxsize = maxsize
+        self._memory = OrderedDict()
+
+    def _remember(self, key, value):
+        """Doda vnos v LRU in po potrebi izloči najstarejšega."""
+
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.maxsize:
+            self._memory.popitem(last=False)
+
+
+class PathCountCache(SQLiteCache):
+    """
+    Predpomnilnik za subpath_number, ključ je kanonični graph6 zapis.
+
+    Vrednosti hranimo v omejenem LRU slovarju v pomnilniku (največ
+    `maxsize` vnosov), če podamo `path`, pa še v SQLite bazi na disku,
+    ki jo lahko hkrati uporablja več procesov in sej.
+
+    Primer:
+        cache = PathCountCache("Data/subpath_cache.sqlite")
+        subpath_number(G, cache=cache)
+        cache.stats()
+    """
+
+    _schema = (
+        "CREATE TABLE IF NOT EXISTS subpath_number "
+        "(graph6 TEXT PRIMARY KEY, pn TEXT NOT NULL)"
+    )
+
+    def __init__(self, path=None, maxsize=100000):
+        super().__init__(path, maxsize)
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def key(self, G):
+        """Vrne ključ (kanonični graph6) za graf G."""
+
+        return canonical_graph6(G)
+
+    def get(self, key):
+        """Vrne shranjeno število poti za ključ ali None."""
+
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            self.memory_hits += 1
+            return self._memory[key]
+
+        conn = self._connection()
+        if conn is not None:
+            row = conn.execute(
+                "SELECT pn FROM subpath_number WHERE graph6 = ?", (key,)
+            ).fetchone()
+            if row is not None:
+                value = int(row[0])
+                self._remember(key, value)
+                self.disk_hits += 1
+                return value
+
+        self.misses += 1
+        return None
+
+    def put(self, key, value):
+        """Shrani (natančno) število poti za ključ."""
+
+        value = int(value)
+        self._remember(key, value)
+
+        conn = self._connection()
+        if conn is not None:
+            # število hranimo kot besedilo, ker je lahko večje od 2^63
+            with conn:
+                conn.execute(
+                    "INSERT OR IGNORE INTO subpath_number (graph6, pn) VALUES (?, ?)",
+                    (key, str(value)),
+                )
+
+    def stats(self):
+        """Vrne slovar s številom zadetkov in deležem zadetkov."""
+
+        hits = self.memory_hits + self.disk_hits
+        lookups = hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": hits / lookups if lookups else 0.0,
+        }
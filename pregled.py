@@ -0,0 +1,452 @@
+import csv
+import json
+import os
+import time
+from bisect import insort
+from collections import Counter
+from multiprocessing import Pool, Value
+
+from funkcije2 import cubic_graphs, encode_time_hms
+from jedro import count_paths, cubic_graph6_lines, find_geng, graph6_batches, _adjacency
+
+def scan_cubic_graphs(n, threshold=None, processes=None, shards=None, verbose=False):
+    """
+    Izčrpno preveri vse kubične grafe na n vozliščih in vrne tiste,
+    za katere je subpath_number(G) < threshold (oz. vse, če je threshold None).
+
+    Izhod geng razdelimo na `shards` delov (res/mod), ki jih obdelamo
+    v `processes` procesih. Delov je privzeto nekajkrat več kot procesov,
+    ker so deli različno zahtevni in tako hitreje procesi prej končajo.
+
+    Vsak graf preštejemo neposredno z omejenim štetjem (limit=threshold),
+    ki se ustavi, ko število poti doseže threshold. Sito s spodnjimi
+    mejami (ožina, kratke poti) pred njim se ne splača: meja iz ožine pri
+    kubičnih grafih ne zavrže ničesar, štetje kratkih poti pa do threshold
+    našteje skoraj toliko poti kot omejeno štetje samo (n = 14..18).
+
+    Vrne:
+        rows  ... seznam (graph6, pn), urejen po delih in znotraj dela
+                  v vrstnem redu geng, zato je izid neodvisen od procesov
+        stats ... seznam slovarjev s statistiko vsakega dela
+                  (res, mod, graphs, found, seconds, graphs_per_s)
+    """
+
+    if processes is None:
+        processes = os.cpu_count() or 1
+    if shards is None:
+        shards = 4 * processes
+
+    tasks = [(n, res, shards, threshold) for res in range(shards)]
+    results = []
+
+    start = time.time()
+    with Pool(processes) as pool:
+        for result in pool.imap_unordered(_scan_shard, tasks):
+            results.append(result)
+
+            if verbose:
+                st = result[1]
+                print(
+                    f"Del {st['res']}/{st['mod']} | grafov: {st['graphs']} | "
+                    f"najdenih: {st['found']} | čas: {encode_time_hms(st['seconds'])} | "
+                    f"{st['graphs_per_s']:.1f} grafov/s"
+                )
+
+    # deterministično združevanje: po vrsti delov
+    results.sort(key=lambda r: r[1]["res"])
+    rows = [row for shard_rows, st in results for row in shard_rows]
+    stats = [st for shard_rows, st in results]
+
+    if verbose:
+        elapsed = time.time() - start
+        total = sum(st["graphs"] for st in stats)
+        print(
+            f"Zaključil n = {n} | grafov: {total} | najdenih: {len(rows)} | "
+            f"čas: {encode_time_hms(elapsed)} | {total / elapsed if elapsed else 0.0:.1f} grafov/s"
+        )
+
+    return rows, stats
+
+
+def resumable_scan(n, threshold, path, shards=256, processes=None, extra=None,
+                   verbose=False):
+    """
+    Kot scan_cubic_graphs, le da rezultate sproti zapisuje v CSV `path`
+    in ga je po prekinitvi mogoče nadaljevati.
+
+    Izhod geng razdelimo na `shards` delov (res/mod). Ko je del obdelan,
+    njegove vrstice dodamo na konec delne datoteke `path + ".part"`
+    (flush + fsync), nato pa v manifest `path + ".manifest.json"` atomarno
+    (zapis v začasno datoteko + os.replace) zapišemo, da je del končan,
+    in novo dolžino delne datoteke. Ob ponovnem zagonu delno datoteko
+    obrežemo na dolžino iz manifesta (vrstice nedokončanega zapisa
+    zavržemo) in obdelamo le še manjkajoče dele.
+
+    Ko so obdelani vsi deli, iz delne datoteke zapišemo `path` z vrsticami,
+    urejenimi po delih (enako kot pri scan_cubic_graphs), v manifest
+    zapišemo "complete": True in delno datoteko pobrišemo. Če je pregled
+    že končan, funkcija le vrne manifest.
+
+    Stolpci CSV so n, graph6, pn(G) in še stolpci iz slovarja `extra`
+    (npr. {"pn(Ln)": ..., "pn(star)": ...}), ki so v vseh vrsticah enaki.
+    Tudi te hranimo v manifestu, zato pregleda z drugimi stolpci ne
+    moremo nadaljevati.
+
+    Vrne manifest (slovar).
+    """
+
+    extra = dict(extra or {})
+    part_path = path + ".part"
+    manifest_path = path + ".manifest.json"
+
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+
+        # nadaljujemo lahko le enak pregled (z enakimi dodatnimi stolpci)
+        if (manifest["n"], manifest["mod"], manifest["threshold"],
+                manifest.get("extra", [])) != (n, shards, threshold, _extra_pairs(extra)):
+            raise ValueError(f"Manifest {manifest_path} pripada drugemu pregledu.")
+
+        if manifest["complete"]:
+            # delna datoteka lahko ostane, če se je zagon prekinil tik pred
+            # njenim brisanjem
+            if os.path.exists(part_path):
+                os.remove(part_path)
+            if verbose:
+                print(f"Preskok n = {n} | pregled je že končan: {path}")
+            return manifest
+
+        # zavržemo vrstice, ki so bile zapisane po zadnjem manifestu
+        with open(part_path, "r+b") as f:
+            f.truncate(manifest["offset"])
+
+        if verbose:
+            print(f"Nadaljujem n = {n} | končanih delov: {len(manifest['done'])}/{shards}")
+    else:
+        if os.path.exists(path):
+            raise FileExistsError(f"Datoteka {path} že obstaja in nima manifesta.")
+
+        with open(part_path, "w", newline="") as f:
+            csv.writer(f).writerow(["n", "graph6", "pn(G)"] + list(extra))
+            offset = f.tell()
+
+        manifest = {
+            "n": n,
+            "mod": shards,
+            "threshold": threshold,
+            "extra": _extra_pairs(extra),
+            "complete": False,
+            "offset": offset,
+            "done": {},
+        }
+        _write_manifest(manifest_path, manifest)
+
+    todo = [res for res in range(shards) if str(res) not in manifest["done"]]
+    tasks = [(n, res, shards, threshold) for res in todo]
+
+    if tasks:
+        if processes is None:
+            processes = os.cpu_count() or 1
+
+        with Pool(processes) as pool:
+            for rows, st in pool.imap_unordered(_scan_shard, tasks):
+
+                # najprej trajno zapišemo vrstice ...
+                with open(part_path, "a", newline="") as f:
+                    start = f.tell()
+                    writer = csv.writer(f)
+                    for graph6, pnG in rows:
+                        writer.writerow([n, graph6, pnG] + list(extra.values()))
+                    f.flush()
+                    os.fsync(f.fileno())
+                    end = f.tell()
+
+                # ... nato pa še manifest
+                st["bytes"] = [start, end]
+                manifest["done"][str(st["res"])] = st
+                manifest["offset"] = end
+                _write_manifest(manifest_path, manifest)
+
+                if verbose:
+                    print(
+                        f"Del {st['res']}/{st['mod']} | grafov: {st['graphs']} | "
+                        f"najdenih: {st['found']} | {st['graphs_per_s']:.1f} grafov/s | "
+                        f"končanih: {len(manifest['done'])}/{shards}"
+                    )
+
+    # delna datoteka ostane nespremenjena, dokler manifest ne pravi, da je
+    # pregled končan, zato je ta korak varno ponoviti
+    _write_sorted_csv(part_path, path, manifest)
+    manifest["complete"] = True
+    _write_manifest(manifest_path, manifest)
+    os.remove(part_path)
+
+    return manifest
+
+
+def _extra_pairs(extra):
+    """Dodatni stolpci kot seznam parov [ime, vrednost] (kot v JSON manifestu)."""
+
+    return [[name, value] for name, value in extra.items()]
+
+
+def _write_manifest(manifest_path, manifest):
+    """Atomarno zapiše manifest (začasna datoteka + os.replace)."""
+
+    tmp = manifest_path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(manifest, f, indent=1)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, manifest_path)
+
+
+def _write_sorted_csv(part_path, path, manifest):
+    """Iz delne datoteke atomarno zapiše CSV z vrsticami, urejenimi po delih (res)."""
+
+    with open(part_path, "rb") as f:
+        data = f.read()
+
+    # glava je vse pred prvim delom
+    parts = sorted(manifest["done"].values(), key=lambda st: st["res"])
+    header_end = min((st["bytes"][0] for st in parts), default=len(data))
+
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(data[:header_end])
+        for st in parts:
+            start, end = st["bytes"]
+            f.write(data[start:end])
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def _scan_shard(task):
+    """Obdela en del (res/mod) izhoda geng; teče v delovnem procesu."""
+
+    n, res, mod, threshold = task
+
+    start = time.time()
+    count = 0
+    rows = []
+    for graph6, adj in _shard_graphs(n, res, mod):
+        count += 1
+        # za primerjavo s threshold zadošča omejeno štetje
+        pnG = count_paths(adj, limit=threshold)
+        if threshold is None or pnG < threshold:
+            rows.append((graph6, pnG))
+    elapsed = time.time() - start
+
+    stats = {
+        "res": res,
+        "mod": mod,
+        "graphs": count,
+        "found": len(rows),
+        "seconds": elapsed,
+        "graphs_per_s": count / elapsed if elapsed > 0 else 0.0,
+    }
+    return rows, stats
+
+
+class TopK:
+    """
+    Omejen seznam k grafov z najmanjšim pn (in neobvezno histogram pn).
+
+    Vnose hranimo urejene po (pn, graph6), zato je izid pregleda neodvisen
+    od vrstnega reda grafov in števila procesov. Ko je seznam poln, je
+    limit() meja za omejeno štetje: graf s pn >= limit() ne more v seznam.
+
+    Pri histogram=True štejemo grafe po vrednosti pn; da so vrednosti
+    natančne, meja ostane statična (threshold), seznam pa se vseeno polni.
+    """
+
+    def __init__(self, k, threshold=None, histogram=False):
+        self.k = k
+        self.threshold = threshold
+        self.entries = []  # urejen seznam (pn, graph6), največ k vnosov
+        self.histogram = Counter() if histogram else None
+        self.graphs = 0
+
+    def limit(self):
+        """Trenutna meja za count_paths(limit=...) ali None."""
+
+        limit = self.threshold
+        if self.histogram is None and len(self.entries) >= self.k:
+            # vnose z enakim pn, kot ga ima k-ti, potrebujemo natančne
+            worst = self.entries[-1][0] + 1
+            limit = worst if limit is None else min(limit, worst)
+        return limit
+
+    def add(self, graph6, pn):
+        """
+        Upošteva graf s številom poti pn (pn >= limit() pomeni "vsaj
+        limit()"). Vrne True, če je graf v seznamu.
+        """
+
+        self.graphs += 1
+        if self.threshold is not None and pn >= self.threshold:
+            return False
+        if self.histogram is not None:
+            self.histogram[pn] += 1
+        return self._insert((pn, graph6))
+
+    def merge(self, other):
+        """Doda vnose, histogram in števec iz drugega TopK (npr. dela)."""
+
+        for entry in other.entries:
+            self._insert(entry)
+        self.graphs += other.graphs
+        if self.histogram is not None and other.histogram is not None:
+            self.histogram.update(other.histogram)
+
+    def _insert(self, entry):
+        """Vstavi (pn, graph6), če je med k najmanjšimi; vrne True, če je."""
+
+        if len(self.entries) >= self.k and entry >= self.entries[-1]:
+            return False
+        insort(self.entries, entry)
+        if len(self.entries) > self.k:
+            self.entries.pop()
+        return True
+
+    def write_csv(self, path, n, extra=None):
+        """
+        Atomarno zapiše seznam v CSV s stolpci n, graph6, pn(G) in stolpci
+        iz extra (kot resumable_scan), histogram pa (če ga štejemo) v
+        datoteko z dodano končnico ".hist.csv" (stolpca pn(G), count).
+        """
+
+        extra = dict(extra or {})
+        tmp = path + ".tmp"
+        with open(tmp, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["n", "graph6", "pn(G)"] + list(extra))
+            for pn, graph6 in self.entries:
+                writer.writerow([n, graph6, pn] + list(extra.values()))
+        os.replace(tmp, path)
+
+        if self.histogram is not None:
+            with open(path + ".hist.csv", "w", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(["pn(G)", "count"])
+                for pn in sorted(self.histogram):
+                    writer.writerow([pn, self.histogram[pn]])
+
+
+def scan_top_k(n, k=100, threshold=None, histogram=False, processes=None, shards=None,
+               verbose=False):
+    """
+    Izčrpno preveri vse kubične grafe na n vozliščih in obdrži le k grafov
+    z najmanjšim pn (glej TopK), namesto da bi vrnil vse pod threshold.
+
+    Vsak del (res/mod) ima svoj TopK. Ko je ta poln, je k-ti najmanjši pn
+    dinamična meja za omejeno štetje; najmanjšo mejo vseh delov si procesi
+    delijo (multiprocessing.Value), saj je globalni k-ti najmanjši pn
+    vedno manjši ali enak. Meja se med pregledom zaostruje, pomnilnik in
+    izhod pa sta omejena s k. Pri histogram=True je meja statična
+    (threshold), histogram pa natančen za vse pn < threshold.
+
+    Vrne:
+        top   ... TopK z združenimi vnosi in histogramom vseh delov
+        stats ... seznam slovarjev s statistiko vsakega dela
+                  (res, mod, graphs, found, seconds, graphs_per_s)
+    """
+
+    if processes is None:
+        processes = os.cpu_count() or 1
+    if shards is None:
+        shards = 4 * processes
+
+    tasks = [(n, res, shards, k, threshold, histogram) for res in range(shards)]
+    top = TopK(k, threshold, histogram)
+    stats = []
+
+    start = time.time()
+    cutoff = Value("q", -1, lock=False)  # -1: meje še ni
+    with Pool(processes, initializer=_init_cutoff, initargs=(cutoff,)) as pool:
+        for part, st in pool.imap_unordered(_scan_shard_top_k, tasks):
+            top.merge(part)
+            stats.append(st)
+
+            if verbose:
+                print(
+                    f"Del {st['res']}/{st['mod']} | grafov: {st['graphs']} | "
+                    f"meja: {st['cutoff']} | {st['graphs_per_s']:.1f} grafov/s"
+                )
+
+    stats.sort(key=lambda st: st["res"])
+    if verbose:
+        elapsed = time.time() - start
+        best = top.entries[0][0] if top.entries else None
+        print(
+            f"Zaključil n = {n} | grafov: {top.graphs} | najmanjši pn: {best} | "
+            f"čas: {encode_time_hms(elapsed)}"
+        )
+
+    return top, stats
+
+
+_shared_cutoff = None  # meja, ki si jo delijo procesi (glej scan_top_k)
+
+
+def _init_cutoff(cutoff):
+    global _shared_cutoff
+    _shared_cutoff = cutoff
+
+
+def _scan_shard_top_k(task):
+    """Obdela en del izhoda geng za scan_top_k; teče v delovnem procesu."""
+
+    n, res, mod, k, threshold, histogram = task
+    shared = _shared_cutoff
+
+    start = time.time()
+    top = TopK(k, threshold, histogram)
+    for graph6, adj in _shard_graphs(n, res, mod):
+        limit = top.limit()
+        if not histogram and shared is not None and shared.value >= 0:
+            limit = shared.value if limit is None else min(limit, shared.value)
+
+        pnG = count_paths(adj, limit=limit)
+        if limit is not None and pnG >= limit:
+            top.graphs += 1
+            continue
+        if top.add(graph6, pnG) and not histogram and shared is not None:
+            limit = top.limit()
+            if limit is not None and len(top.entries) >= k:
+                # neatomarno, a meja se le zmanjšuje; v najslabšem primeru
+                # kratek čas štejemo z nekoliko ohlapnejšo mejo
+                if shared.value < 0 or limit < shared.value:
+                    shared.value = limit
+    elapsed = time.time() - start
+
+    stats = {
+        "res": res,
+        "mod": mod,
+        "graphs": top.graphs,
+        "found": len(top.entries),
+        "cutoff": top.limit(),
+        "seconds": elapsed,
+        "graphs_per_s": top.graphs / elapsed if elapsed > 0 else 0.0,
+    }
+    return top, stats
+
+
+def _shard_graphs(n, res, mod):
+    """
+    Generator parov (graph6, adj) za en del izhoda geng.
+
+    Če najdemo program geng, njegov izhod beremo in dekodiramo neposredno
+    (brez gradnje Sage grafov), sicer gremo prek cubic_graphs.
+    """
+
+    geng = find_geng()
+    if geng is not None:
+        for batch in graph6_batches(cubic_graph6_lines(n, res, mod, geng)):
+            for line, adj in batch:
+                yield line.decode("ascii"), adj
+    else:
+        for G in cubic_graphs(n, res, mod):
+            yield G.graph6_string(), _adjacency(G)[1]
@@ -0,0 +1,231 @@
+import csv
+import glob
+import json
+import os
+import re
+import time
+
+from predpomnilnik import SQLiteStore, canonical_graph6
+
+
+class ResultStore(SQLiteStore):
+    """
+    Zbirka najdenih grafov v eni SQLite bazi (namesto Data/boljsi_Ln_n*.csv
+    in Data/SA_results*.csv).
+
+    Ključ je kanonični graph6 zapis, zato se izomorfni grafi iz različnih
+    zagonov (ali z različnimi graph6 zapisi) shranijo enkrat. Za vsak graf
+    hranimo n in pn, za vsak zagon pa izvor (npr. "scan", "sa", "tabu",
+    "import"), parametre in čas izvajanja; tabela findings pove, v katerih
+    zagonih smo graf našli (in s katerim prvotnim graph6 zapisom).
+
+    Tabele:
+        graphs   (graph6, n, pn, pn_exact, added)
+        runs     (id, source, params, started, seconds)
+        findings (graph6, run, original)
+
+    pn je shranjen kot REAL (za indeks po (n, pn) in urejanje) in natančno
+    kot besedilo pn_exact, ker je lahko večji od 2^63.
+
+    Bazo lahko hkrati uporablja več procesov (WAL, vsak proces svoja
+    povezava, kratke transakcije).
+
+    Primer:
+        store = ResultStore("Data/rezultati.sqlite")
+        store.import_data("Data")
+        run = store.add_run("sa", {"steps": 20000}, seconds=61.5)
+        store.add(G, pn, run)
+        store.best()
+    """
+
+    _schema = (
+        "CREATE TABLE IF NOT EXISTS graphs ("
+        "  graph6 TEXT PRIMARY KEY, n INTEGER NOT NULL,"
+        "  pn REAL NOT NULL, pn_exact TEXT NOT NULL, added TEXT);"
+        "CREATE INDEX IF NOT EXISTS graphs_n_pn ON graphs (n, pn);"
+        "CREATE TABLE IF NOT EXISTS runs ("
+        "  id INTEGER PRIMARY KEY AUTOINCREMENT, source TEXT NOT NULL,"
+        "  params TEXT, started TEXT, seconds REAL);"
+        "CREATE TABLE IF NOT EXISTS findings ("
+        "  graph6 TEXT NOT NULL REFERENCES graphs (graph6),"
+        "  run INTEGER NOT NULL REFERENCES runs (id),"
+        "  original TEXT, PRIMARY KEY (graph6, run));"
+        "CREATE INDEX IF NOT EXISTS findings_run ON findings (run);"
+    )
+
+    def __init__(self, path="Data/rezultati.sqlite"):
+        super().__init__(path)
+
+    def add_run(self, source, params=None, seconds=None):
+        """Zapiše zagon (izvor, parametri, čas v sekundah) in vrne njegov id."""
+
+        conn = self._connection()
+        with conn:
+            cur = conn.execute(
+                "INSERT INTO runs (source, params, started, seconds) VALUES (?, ?, ?, ?)",
+                (source, json.dumps(params or {}, sort_keys=True),
+                 time.strftime("%Y-%m-%dT%H:%M:%S"), seconds),
+            )
+        return cur.lastrowid
+
+    def finish_run(self, run, seconds):
+        """Zapiše čas izvajanja zagona, ki smo ga začeli z add_run."""
+
+        conn = self._connection()
+        with conn:
+            conn.execute("UPDATE runs SET seconds = ? WHERE id = ?", (seconds, run))
+
+    def add(self, G, pn=None, run=None):
+        """
+        Shrani graf G (Sage Graph ali graph6 niz) s številom poti pn; če pn
+        ni podan, ga izračunamo. Vrne kanonični graph6 zapis.
+        """
+
+        return self.add_many([(G, pn)], run)[0]
+
+    def add_many(self, rows, run=None):
+        """
+        Shrani pare (G, pn) v eni transakciji (npr. vse rezultate enega
+        dela pregleda). Že shranjenih grafov ne podvajamo. Vrne seznam
+        kanoničnih graph6 zapisov.
+        """
+
+        records = []
+        for G, pn in rows:
+            original = G if isinstance(G, str) else G.graph6_string()
+            if pn is None:
+                from funkcije2 import subpath_number
+                from sage.all import Graph
+                pn = subpath_number(Graph(G) if isinstance(G, str) else G)
+            key = canonical_graph6(G)
+            records.append((key, _graph6_order(key), int(pn), original))
+
+        added = time.strftime("%Y-%m-%dT%H:%M:%S")
+        conn = self._connection()
+        with conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO graphs (graph6, n, pn, pn_exact, added) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(key, n, float(pn), str(pn), added) for key, n, pn, _ in records],
+            )
+            if run is not None:
+                conn.executemany(
+                    "INSERT OR IGNORE INTO findings (graph6, run, original) VALUES (?, ?, ?)",
+                    [(key, run, original) for key, _, _, original in records],
+                )
+
+        return [key for key, _, _, _ in records]
+
+    def best(self, n=None):
+        """
+        Najboljši (najmanjši pn) graf za vsak n oz. le za podani n.
+        Vrne seznam (n, graph6, pn) oz. en tak zapis (ali None).
+        """
+
+        if n is not None:
+            rows = self.query(n, limit=1)
+            return rows[0] if rows else None
+
+        rows = self._connection().execute(
+            "SELECT g.n, g.graph6, g.pn_exact FROM graphs AS g "
+            "JOIN (SELECT n, MIN(pn) AS pn FROM graphs GROUP BY n) AS b "
+            "ON g.n = b.n AND g.pn = b.pn "
+            "ORDER BY g.n, length(g.pn_exact), g.pn_exact, g.graph6"
+        ).fetchall()
+
+        # pri enakem REAL (zelo velika števila) vzamemo natančno najmanjšega
+        best = {}
+        for n, graph6, pn in rows:
+            if n not in best:
+                best[n] = (n, graph6, int(pn))
+        return list(best.values())
+
+    def query(self, n, pn_below=None, limit=None):
+        """
+        Grafi na n vozliščih, urejeni po pn (neobvezno le s pn < pn_below in
+        največ limit zapisov). Vrne seznam (n, graph6, pn).
+        """
+
+        sql = "SELECT n, graph6, pn_exact FROM graphs WHERE n = ?"
+        args = [n]
+        if pn_below is not None:
+            # REAL je lahko zaokrožen, natančno primerjamo spodaj
+            sql += " AND pn <= ?"
+            args.append(float(pn_below))
+        sql += " ORDER BY pn, length(pn_exact), pn_exact, graph6"
+
+        rows = []
+        for n, graph6, pn in self._connection().execute(sql, args):
+            pn = int(pn)
+            if pn_below is not None and pn >= pn_below:
+                continue
+            rows.append((n, graph6, pn))
+            if limit is not None and len(rows) >= limit:
+                break
+        return rows
+
+    def runs(self, graph6=None):
+        """
+        Zagoni (id, source, params, started, seconds); če podamo graph6
+        (poljuben zapis grafa), le tisti, v katerih smo graf našli.
+        """
+
+        conn = self._connection()
+        if graph6 is None:
+            rows = conn.execute(
+                "SELECT id, source, params, started, seconds FROM runs ORDER BY id"
+            ).fetchall()
+        else:
+            rows = conn.execute(
+                "SELECT r.id, r.source, r.params, r.started, r.seconds "
+                "FROM runs AS r JOIN findings AS f ON f.run = r.id "
+                "WHERE f.graph6 = ? ORDER BY r.id",
+                (canonical_graph6(graph6),),
+            ).fetchall()
+        return [(i, source, json.loads(params), started, seconds)
+                for i, source, params, started, seconds in rows]
+
+    def import_csv(self, path):
+        """
+        Uvozi CSV z rezultati. Prepozna obliko pregleda (stolpca graph6 in
+        pn(G), npr. Data/boljsi_Ln_n*.csv) in obliko SA (best_G in best_pn,
+        npr. Data/SA_results.csv). Vsaka datoteka je svoj zagon z izvorom
+        "import" in imenom datoteke v parametrih; že uvožene datoteke
+        (enako ime in velikost) preskočimo. Vrne id zagona ali None.
+        """
+
+        params = {"file": os.path.basename(path), "bytes": os.path.getsize(path)}
+        for _, source, old, _, _ in self.runs():
+            if source == "import" and all(old.get(k) == v for k, v in params.items()):
+                return None
+
+        with open(path, newline="") as f:
+            reader = csv.DictReader(f)
+            if "best_G" in reader.fieldnames:
+                rows = [(r["best_G"], int(r["best_pn"])) for r in reader if r["best_G"]]
+                params["kind"] = "sa"
+            else:
+                rows = [(r["graph6"], int(r["pn(G)"])) for r in reader if r["graph6"]]
+                params["kind"] = "scan"
+
+        run = self.add_run("import", params)
+        self.add_many(rows, run)
+        return run
+
+    def import_data(self, folder="Data"):
+        """Uvozi vse datoteke boljsi_Ln_n*.csv in SA_results*.csv iz mape folder."""
+
+        paths = glob.glob(os.path.join(folder, "boljsi_Ln_n*.csv"))
+        paths.sort(key=lambda p: int(re.search(r"n(\d+)", os.path.basename(p)).group(1)))
+        paths += sorted(glob.glob(os.path.join(folder, "SA_results*.csv")))
+        return [run for run in map(self.import_csv, paths) if run is not None]
+
+
+def _graph6_order(s):
+    """Število vozlišč iz graph6 zapisa (brez dekodiranja grafa)."""
+
+    if s[0] != "~":
+        return ord(s[0]) - 63
+    if s[1] != "~":
+        return ((ord(s[1]) - 63) << 12) | ((ord(s[2]) - 63) << 6) | (ord(s[3]) - 63)
+    return sum((ord(c) - 63) << (6 * (5 - i)) for i, c in enumerate(s[2:8]))
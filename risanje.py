@@ -0,0 +1,281 @@
+import json
+import os
+from collections import deque
+from multiprocessing import Pool
+
+from jedro import graph6_to_adj, _adjacency
+from predpomnilnik import SQLiteCache
+
+# ============================================================
+# Postavitve in risanje grafov
+# ------------------------------------------------------------
+# Drevesno postavitev (razpenjalno drevo + drevesni layout) računamo
+# neposredno iz seznama sosedov v času O(n + m), brez gradnje Sage grafov.
+# Ostale postavitve (drage, npr. "spring") lahko hranimo v LayoutCache,
+# kjer je ključ kanonični graph6 zapis z imenom in argumenti postavitve
+# (npr. iterations); koordinate hranimo po kanoničnem oštevilčenju, zato
+# jih lahko uporabimo za vsak izomorfen graf.
+# render_graphs nariše več grafov v datoteke v več procesih (matplotlib).
+# ============================================================
+
+
+def spanning_tree_adj(adj, root=0):
+    """
+    Razpenjalno drevo (BFS) grafa s seznamom sosedov adj.
+
+    Vrne (parent, children, depth, order): parent[v] je starš v (korenu in
+    vozliščem izven komponente korena -1), children[v] seznam otrok v
+    vrstnem redu adj[v], depth[v] globina, order pa vozlišča v vrstnem
+    redu BFS. Čas je O(n + m).
+    """
+
+    n = len(adj)
+    parent = [-1] * n
+    depth = [-1] * n
+    children = [[] for _ in range(n)]
+    order = _bfs_tree(adj, root, parent, children, depth)
+
+    return parent, children, depth, order
+
+
+def _bfs_tree(adj, root, parent, children, depth):
+    """
+    BFS iz root, ki drevo zapiše v podane sezname (depth[v] == -1 pomeni
+    neobiskano vozlišče). Vrne vozlišča komponente v vrstnem redu BFS;
+    čas je sorazmeren velikosti komponente.
+    """
+
+    order = [root]
+    depth[root] = 0
+    Q = deque([root])
+    while Q:
+        v = Q.popleft()
+        for u in adj[v]:
+            if depth[u] == -1:
+                depth[u] = depth[v] + 1
+                parent[u] = v
+                children[v].append(u)
+                order.append(u)
+                Q.append(u)
+
+    return order
+
+
+def tree_layout_adj(adj, root=0, vertical_scale=4):
+    """
+    Drevesna postavitev grafa s seznamom sosedov adj (kot
+    funkcije2.tree_layout_for_graph): na razpenjalnem drevesu z danim
+    korenom so listi enakomerno razporejeni, notranja vozlišča dobijo
+    povprečje x-koordinat svojih otrok, y je -globina * vertical_scale.
+    Nepovezane komponente postavimo desno od prejšnjih.
+
+    Vrne seznam pos[v] = (x, y). Čas je O(n + m), brez rekurzije.
+    """
+
+    n = len(adj)
+    pos = [None] * n
+    counter = 0
+
+    # sezname alociramo enkrat za vse komponente
+    parent = [-1] * n
+    depth = [-1] * n
+    children = [[] for _ in range(n)]
+    x = [0] * n
+
+    roots = [root] + [v for v in range(n) if v != root]
+    for r in roots:
+        if depth[r] != -1:
+            continue
+        order = _bfs_tree(adj, r, parent, children, depth)
+
+        # listi dobijo zaporedne x v vrstnem redu DFS (preorder), zato
+        # jih naštejemo z eksplicitnim skladom
+        stack = [r]
+        while stack:
+            v = stack.pop()
+            if not children[v]:
+                x[v] = counter
+                counter += 1
+            else:
+                stack.extend(reversed(children[v]))
+
+        # notranja vozlišča od spodaj navzgor (obraten BFS)
+        for v in reversed(order):
+            if children[v]:
+                x[v] = sum(x[u] for u in children[v]) / len(children[v])
+            pos[v] = (x[v], -depth[v] * vertical_scale)
+
+    return pos
+
+
+def graph_layout(G, layout="tree", root=0, cache=None, **layout_kwds):
+    """
+    Vrne slovar pos[v] = (x, y) za G.plot(pos=pos, ...).
+
+    G je Sage Graph ali graph6 niz (pri graph6 so vozlišča 0..n-1).
+    layout="tree" je drevesna postavitev (tree_layout_adj), ostale
+    postavitve (npr. "spring" z iterations=...) izračuna Sage.
+    Če podamo cache (LayoutCache), ostale postavitve najprej poiščemo v
+    njem; drevesne ne, ker je O(n) in cenejša od kanonične oznake.
+    """
+
+    if layout == "tree":
+        if isinstance(G, str):
+            verts, adj = None, graph6_to_adj(G)
+        else:
+            verts, adj = _adjacency(G)
+        positions = tree_layout_adj(adj, root if verts is None else verts.index(root))
+        return dict(zip(verts if verts is not None else range(len(adj)), positions))
+
+    if cache is not None:
+        pos = cache.get(G, layout, layout_kwds)
+        if pos is not None:
+            return pos
+
+    if isinstance(G, str):
+        from sage.all import Graph
+        G = Graph(G)
+    pos = G.layout(layout=layout, **layout_kwds)
+
+    if cache is not None:
+        cache.put(G, layout, pos, layout_kwds)
+    return pos
+
+
+class LayoutCache(SQLiteCache):
+    """
+    Predpomnilnik postavitev grafov, ključ je (kanonični graph6, layout,
+    argumenti postavitve), npr. ("I...", "spring", '{"iterations": 800}').
+
+    Koordinate hranimo po kanoničnem oštevilčenju (certifikat iz Sage
+    canonical_label), zato postavitev, izračunano za en graf, dobimo za
+    vsak izomorfen graf, ne glede na oznake vozlišč. Kot pri
+    predpomnilnik.PathCountCache hranimo vnose v omejenem LRU slovarju,
+    če podamo path, pa še v SQLite bazi, ki jo lahko deli več procesov.
+    """
+
+    _schema = (
+        "CREATE TABLE IF NOT EXISTS layouts "
+        "(graph6 TEXT NOT NULL, layout TEXT NOT NULL, params TEXT NOT NULL, "
+        "pos TEXT NOT NULL, PRIMARY KEY (graph6, layout, params))"
+    )
+
+    def __init__(self, path=None, maxsize=10000):
+        super().__init__(path, maxsize)
+
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, G, layout, layout_kwds=None):
+        """Vrne postavitev pos za G (z oznakami G) ali None."""
+
+        key, certificate = self._canonical(G)
+        params = _params(layout_kwds)
+        stored = self._memory.get((key, layout, params))
+        if stored is None:
+            conn = self._connection()
+            if conn is not None:
+                row = conn.execute(
+                    "SELECT pos FROM layouts WHERE graph6 = ? AND layout = ? AND params = ?",
+                    (key, layout, params),
+                ).fetchone()
+                if row is not None:
+                    stored = [tuple(p) for p in json.loads(row[0])]
+                    self._remember((key, layout, params), stored)
+
+        if stored is None:
+            self.misses += 1
+            return None
+
+        self._memory.move_to_end((key, layout, params))
+        self.hits += 1
+        return {v: stored[c] for v, c in certificate.items()}
+
+    def put(self, G, layout, pos, layout_kwds=None):
+        """Shrani postavitev pos (slovar po vozliščih G)."""
+
+        key, certificate = self._canonical(G)
+        params = _params(layout_kwds)
+        stored = [None] * len(certificate)
+        for v, c in certificate.items():
+            stored[c] = tuple(float(t) for t in pos[v])
+        self._remember((key, layout, params), stored)
+
+        conn = self._connection()
+        if conn is not None:
+            with conn:
+                conn.execute(
+                    "INSERT OR IGNORE INTO layouts (graph6, layout, params, pos) "
+                    "VALUES (?, ?, ?, ?)",
+                    (key, layout, params, json.dumps(stored)),
+                )
+
+    def _canonical(self, G):
+        """Kanonični graph6 in certifikat (vozlišče G -> kanonično vozlišče)."""
+
+        from sage.all import Graph
+        if isinstance(G, str):
+            G = Graph(G)
+        C, certificate = G.canonical_label(certificate=True)
+        return C.graph6_string(), certificate
+
+
+def _params(layout_kwds):
+    """Argumenti postavitve kot enoličen niz (del ključa v LayoutCache)."""
+
+    return json.dumps(layout_kwds or {}, sort_keys=True)
+
+
+def render_graphs(jobs, folder, layout="tree", processes=None, cache=None, fmt="png",
+                  **style):
+    """
+    Nariše grafe v datoteke folder/<ime>.<fmt> v več procesih.
+
+    jobs je seznam trojic (ime, graph6, naslov) (naslov je lahko None).
+    Postavitev dobimo z graph_layout (layout, cache), rišemo pa
+    neposredno z matplotlib (črna vozlišča, brez oznak in osi, kot v
+    main.ipynb). Slog lahko spremenimo z argumenti style:
+        vertex_size (10), edge_thickness (1), figsize ((5, 5)),
+        fontsize (12), dpi (150), layout_kwds (npr. {"iterations": 800}).
+
+    Vrne seznam poti do narisanih datotek v vrstnem redu jobs.
+    """
+
+    os.makedirs(folder, exist_ok=True)
+    tasks = [(os.path.join(folder, f"{name}.{fmt}"), graph6, title, layout, cache, style)
+             for name, graph6, title in jobs]
+
+    if processes == 1 or len(tasks) <= 1:
+        return [_render(task) for task in tasks]
+
+    with Pool(processes) as pool:
+        return pool.map(_render, tasks)
+
+
+def _render(task):
+    """Nariše en graf v datoteko; teče v delovnem procesu."""
+
+    path, graph6, title, layout, cache, style = task
+
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    from matplotlib.collections import LineCollection
+
+    adj = graph6_to_adj(graph6)
+    pos = graph_layout(graph6, layout, cache=cache, **style.get("layout_kwds", {}))
+
+    fig, ax = plt.subplots(figsize=style.get("figsize", (5, 5)))
+    segments = [(pos[u], pos[v]) for u in range(len(adj)) for v in adj[u] if u < v]
+    ax.add_collection(LineCollection(segments, colors="black",
+                                     linewidths=style.get("edge_thickness", 1)))
+    xs, ys = zip(*(pos[v] for v in range(len(adj))))
+    ax.scatter(xs, ys, s=style.get("vertex_size", 10), c="black", zorder=2)
+    ax.set_axis_off()
+    ax.autoscale()
+    if title:
+        ax.set_title(title, fontsize=style.get("fontsize", 12))
+
+    fig.savefig(path, dpi=style.get("dpi", 150), bbox_inches="tight")
+    plt.close(fig)
+    return path
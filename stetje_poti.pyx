@@ -0,0 +1,268 @@
+# cython: boundscheck=False, wraparound=False, cdivision=True
+"""
+Prevedeno jedro za štetje poti (glej jedro._count_paths_fast).
+
+Algoritem je enak kot v čisti Python različici: vsako neusmerjeno pot
+preštejemo natanko enkrat pri njenem najmanjšem vozlišču m. Če je m
+krajišče poti, jo najdemo z DFS iz m po vozliščih > m; če je m notranje
+vozlišče, pot razpade na dva kraka iz m (prvi sosed a < drugi sosed b),
+ki ju naštejemo z gnezdenim DFS.
+
+Sosede hranimo kot 64-bitne maske, zato jedro deluje le za n <= 64.
+Če podamo cap > 0, se štetje ustavi, ko števec doseže cap.
+"""
+
+cdef extern from *:
+    int __builtin_ctzll(unsigned long long x) nogil
+
+
+cdef unsigned long long _count_from(unsigned long long *nbm, int b,
+                                    unsigned long long mask) noexcept nogil:
+    """Število poti z začetkom v b, ki se izognejo vozliščem iz mask."""
+
+    cdef unsigned long long sm[64]
+    cdef unsigned long long srem[64]
+    cdef unsigned long long total = 1
+    cdef unsigned long long bit, newmask
+    cdef int d = 0
+    cdef int w
+
+    sm[0] = mask
+    srem[0] = nbm[b] & ~mask
+    while d >= 0:
+        if srem[d]:
+            bit = srem[d] & (~srem[d] + 1)
+            srem[d] ^= bit
+            w = __builtin_ctzll(bit)
+            newmask = sm[d] | bit
+            total += 1
+            d += 1
+            sm[d] = newmask
+            srem[d] = nbm[w] & ~newmask
+        else:
+            d -= 1
+
+    return total
+
+
+cdef unsigned long long _count_arm(unsigned long long *nbm, int a,
+                                   unsigned long long mask0,
+                                   unsigned long long bs,
+                                   unsigned long long cap) noexcept nogil:
+    """
+    Prešteje poti, katerih prvi krak iz m se začne v a: vsak prvi krak
+    (vozlišče DFS) šteje kot pot s krajiščem m, za vsak drugi krak iz
+    soseda b v bs pa dodamo še vse poti z m v notranjosti. Ustavi se,
+    ko števec doseže cap.
+    """
+
+    cdef unsigned long long sm[64]
+    cdef unsigned long long srem[64]
+    cdef unsigned long long total = 0
+    cdef unsigned long long bit, newmask
+    cdef int d = 0
+    cdef int w
+
+    sm[0] = mask0
+    srem[0] = nbm[a] & ~mask0
+    total += _arm_node(nbm, mask0, bs)
+    while d >= 0 and total < cap:
+        if srem[d]:
+            bit = srem[d] & (~srem[d] + 1)
+            srem[d] ^= bit
+            w = __builtin_ctzll(bit)
+            newmask = sm[d] | bit
+            d += 1
+            sm[d] = newmask
+            srem[d] = nbm[w] & ~newmask
+            total += _arm_node(nbm, newmask, bs)
+        else:
+            d -= 1
+
+    return total
+
+
+cdef inline unsigned long long _arm_node(unsigned long long *nbm,
+                                         unsigned long long mask,
+                                         unsigned long long bs) noexcept nogil:
+    """Prispevek enega prvega kraka z množico obiskanih vozlišč mask."""
+
+    cdef unsigned long long total = 1  # pot s krajiščem m
+    cdef unsigned long long free = bs & ~mask
+    cdef unsigned long long bit
+    cdef int b
+
+    while free:
+        bit = free & (~free + 1)
+        free ^= bit
+        b = __builtin_ctzll(bit)
+        total += _count_from(nbm, b, mask | bit)
+
+    return total
+
+
+def count_undirected_paths(adj, cap=0):
+    """
+    Vrne število netrivialnih neusmerjenih poti v grafu s seznamom
+    sosedov adj (vozlišča 0..n-1, n <= 64). Pri cap > 0 vrne število
+    >= cap, takoj ko ga doseže.
+    """
+
+    cdef int n = len(adj)
+    if n > 64:
+        raise ValueError("Prevedeno jedro podpira največ 64 vozlišč.")
+
+    cdef unsigned long long nbm[64]
+    cdef int i, m, a, w
+    cdef unsigned long long low, rest, bit
+    cdef unsigned long long total = 0
+    cdef unsigned long long limit = cap if cap > 0 else ~(<unsigned long long>0)
+
+    for i in range(n):
+        nbm[i] = 0
+        for w in adj[i]:
+            nbm[i] |= (<unsigned long long>1) << w
+
+    with nogil:
+        for m in range(n):
+            if total >= limit:
+                break
+
+            # vozlišča <= m so prepovedana
+            if m == 63:
+                low = ~(<unsigned long long>0)
+            else:
+                low = ((<unsigned long long>1) << (m + 1)) - 1
+
+            rest = nbm[m] & ~low  # sosedi m, večji od m
+            while rest and total < limit:
+                bit = rest & (~rest + 1)
+                rest ^= bit
+                a = __builtin_ctzll(bit)
+                # drugi krak gre v soseda b > a, torej v preostanek rest
+                total += _count_arm(nbm, a, low | bit, rest, limit - total)
+
+    return total
+
+
+def count_paths_through(adj, int a, int b, cap=0):
+    """
+    Vrne število neusmerjenih poti, ki vsebujejo rob (a, b)
+    (glej jedro._count_paths_through). Pri cap > 0 vrne število
+    >= cap, takoj ko ga doseže.
+    """
+
+    cdef int n = len(adj)
+    if n > 64:
+        raise ValueError("Prevedeno jedro podpira največ 64 vozlišč.")
+
+    cdef unsigned long long nbm[64]
+    cdef unsigned long long sm[64]
+    cdef unsigned long long srem[64]
+    cdef int i, w, d
+    cdef unsigned long long bit, newmask
+    cdef unsigned long long total = 0
+    cdef unsigned long long limit = cap if cap > 0 else ~(<unsigned long long>0)
+
+    for i in range(n):
+        nbm[i] = 0
+        for w in adj[i]:
+            nbm[i] |= (<unsigned long long>1) << w
+
+    with nogil:
+        # DFS po delih poti na strani a; za vsakega preštejemo nadaljevanja od b
+        d = 0
+        sm[0] = ((<unsigned long long>1) << a) | ((<unsigned long long>1) << b)
+        srem[0] = nbm[a] & ~sm[0]
+        total += _count_from(nbm, b, sm[0])
+        while d >= 0 and total < limit:
+            if srem[d]:
+                bit = srem[d] & (~srem[d] + 1)
+                srem[d] ^= bit
+                w = __builtin_ctzll(bit)
+                newmask = sm[d] | bit
+                d += 1
+                sm[d] = newmask
+                srem[d] = nbm[w] & ~newmask
+                total += _count_from(nbm, b, newmask)
+            else:
+                d -= 1
+
+    return total
+
+
+def count_paths_from(adj, int v):
+    """
+    Vrne število poti z začetkom v v (vključno s trivialno potjo), glej
+    jedro._count_paths_from (način "orbits").
+    """
+
+    cdef int n = len(adj)
+    if n > 64:
+        raise ValueError("Prevedeno jedro podpira največ 64 vozlišč.")
+
+    cdef unsigned long long nbm[64]
+    cdef int i, w
+    cdef unsigned long long total
+
+    for i in range(n):
+        nbm[i] = 0
+        for w in adj[i]:
+            nbm[i] |= (<unsigned long long>1) << w
+
+    with nogil:
+        total = _count_from(nbm, v, (<unsigned long long>1) << v)
+
+    return total
+
+
+def count_short_paths(adj, int k, cap=0):
+    """
+    Vrne število netrivialnih usmerjenih poti z največ k povezavami
+    (glej jedro._count_short_paths). Pri cap > 0 vrne število >= cap,
+    takoj ko ga doseže.
+    """
+
+    cdef int n = len(adj)
+    if n > 64:
+        raise ValueError("Prevedeno jedro podpira največ 64 vozlišč.")
+
+    cdef unsigned long long nbm[64]
+    cdef unsigned long long sm[64]
+    cdef unsigned long long srem[64]
+    cdef int i, s, w, d
+    cdef unsigned long long bit, newmask
+    cdef unsigned long long total = 0
+    cdef unsigned long long limit = cap if cap > 0 else ~(<unsigned long long>0)
+
+    if k > n - 1:
+        k = n - 1
+
+    for i in range(n):
+        nbm[i] = 0
+        for w in adj[i]:
+            nbm[i] |= (<unsigned long long>1) << w
+
+    with nogil:
+        for s in range(n):
+            if total >= limit or k <= 0:
+                break
+            d = 0
+            sm[0] = (<unsigned long long>1) << s
+            srem[0] = nbm[s] & ~sm[0]
+            while d >= 0:
+                if srem[d]:
+                    bit = srem[d] & (~srem[d] + 1)
+                    srem[d] ^= bit
+                    w = __builtin_ctzll(bit)
+                    total += 1
+                    # globina d + 1 je dolžina pravkar podaljšane poti
+                    if d + 1 < k:
+                        newmask = sm[d] | bit
+                        d += 1
+                        sm[d] = newmask
+                        srem[d] = nbm[w] & ~newmask
+                else:
+                    d -= 1
+
+    return total